@@ -0,0 +1,122 @@
+"""
+Import Time - Tempo de import dos módulos utilitários (python -X importtime)
+
+data_loader.py e machine-learning/src/utils.py carregam pandas, SQLAlchemy, dotenv e
+matplotlib/seaborn só no primeiro uso. Este benchmark importa cada módulo em um
+processo novo com `python -X importtime`, mede o tempo cumulativo do import e falha
+(código de saída 1) se:
+- algum módulo pesado proibido for importado junto, ou
+- o tempo mediano passar do orçamento (--budget-ms).
+
+Uso (a partir de data_base_construction/):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeats 10 --budget-ms 30
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.view_benchmark import RESULTS_DIR, git_commit
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # data_base_construction/
+REPO_DIR = BASE_DIR.parent
+
+# módulo -> (diretório de onde é importado, pacotes que não podem ser carregados no import)
+TARGETS = {
+    "db_populate_scipts.data_loader": (BASE_DIR, ["pandas", "sqlalchemy", "dotenv"]),
+    "src.utils": (REPO_DIR / "machine-learning", ["pandas", "matplotlib", "seaborn"]),
+}
+
+DEFAULT_REPEATS = 5
+DEFAULT_BUDGET_MS = 50.0
+
+# ============================================================================
+# MEDIÇÃO
+# ============================================================================
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Linhas 'import time: self | cumulative | pacote' -> {pacote: cumulativo em µs}."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if cum.isdigit():
+            cumulative[name] = int(cum)
+    return cumulative
+
+
+def measure(module: str, cwd: Path) -> Dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def run_target(module: str, repeats: int, budget_ms: float) -> Dict:
+    cwd, forbidden = TARGETS[module]
+    times_ms: List[float] = []
+    loaded = set()
+    for _ in range(repeats):
+        try:
+            cumulative = measure(module, cwd)
+        except ImportError as e:
+            return {"module": module, "error": str(e), "budget_ms": budget_ms, "forbidden_loaded": [], "ok": False}
+        times_ms.append(cumulative[module] / 1000)
+        loaded.update(name for name in cumulative if name.split(".")[0] in forbidden)
+
+    median_ms = statistics.median(times_ms)
+    return {
+        "module": module,
+        "median_ms": median_ms,
+        "min_ms": min(times_ms),
+        "budget_ms": budget_ms,
+        "forbidden_loaded": sorted({name.split(".")[0] for name in loaded}),
+        "ok": median_ms <= budget_ms and not loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede e protege o tempo de import dos módulos utilitários.")
+    parser.add_argument("--modules", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Processos novos por módulo")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Tempo máximo (mediana) por import")
+    parser.add_argument("--output", type=Path, default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args()
+
+    report = {"commit": git_commit(), "timestamp": datetime.now().isoformat(timespec="seconds"), "results": []}
+    for module in args.modules:
+        result = run_target(module, args.repeats, args.budget_ms)
+        report["results"].append(result)
+        status = "✅" if result["ok"] else "❌"
+        if "error" in result:
+            print(f"{status} {module:<32} import falhou: {result['error']}")
+            continue
+        extra = f"  carregou {', '.join(result['forbidden_loaded'])}" if result["forbidden_loaded"] else ""
+        print(f"{status} {module:<32} mediana {result['median_ms']:7.1f} ms  (orçamento {args.budget_ms:.0f} ms){extra}")
+
+    output = args.output or RESULTS_DIR / f"import_time_{report['commit']}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados salvos em {output}")
+
+    if not all(result["ok"] for result in report["results"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
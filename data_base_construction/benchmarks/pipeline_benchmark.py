@@ -0,0 +1,359 @@
+"""
+Pipeline Benchmark - Tempo, vazão e pico de memória de cada etapa do pipeline
+
+Executa o pipeline completo sobre um catálogo sintético (synthetic_catalog.py) e
+mede cada etapa em um processo próprio, para que o pico de RSS de uma etapa não
+contamine a seguinte:
+
+    scrape_parse   páginas SINTÉTICAS de benchmarks/fixtures (IMDb → link, Metacritic → notas);
+                   HTML curto escrito à mão com os seletores do scraper, não páginas gravadas
+                   do site: mede o custo das funções de parsing, não o de páginas reais
+                   (para isso, grave com SCRAPER_ARCHIVE_MODE=record e use benchmarks.scraper_replay)
+    feature_build  estatísticas das notas (scores_processor.rating_stats_from_scores_map)
+    etl_load       populate_db.py em um banco descartável (schema.sql aplicado antes)
+    view_query     SELECT * FROM ml_training_dataset (features calculadas no banco)
+    train          pipeline do notebook 05 (imputer + scaler + CatBoost) em ml_split_train
+    predict        predict_proba sobre ml_training_dataset_mat
+
+Escopo: o benchmark não usa páginas reais do Metacritic. O arquivo do scraper
+(scraper_archive.py) grava HARs, que não trazem o DOM renderizado depois da rolagem que
+parse_critic_scores_html lê, e nenhuma página foi gravada até agora. A estrutura real das
+páginas é medida apenas pelo benchmarks.scraper_replay, a partir de um arquivo gravado.
+
+Os resultados vão para benchmarks/results/pipeline_benchmark_<commit>_<data>.json,
+no mesmo formato de comparação do view_benchmark.py.
+
+Uso (a partir de data_base_construction/):
+    python -m benchmarks.pipeline_benchmark
+    python -m benchmarks.pipeline_benchmark --scale 10 --stages etl_load view_query
+    python -m benchmarks.pipeline_benchmark --compare benchmarks/results/pipeline_benchmark_<antigo>.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from dotenv import load_dotenv
+
+from benchmarks.synthetic_catalog import DEFAULT_SEED, fit_catalog_profile, generate_catalog
+from benchmarks.view_benchmark import (
+    BENCH_DB_PREFIX,
+    RESULTS_DIR,
+    create_bench_database,
+    db_settings,
+    drop_bench_database,
+    git_commit,
+    run_populate,
+)
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # data_base_construction/
+ML_DIR = BASE_DIR.parent / "machine-learning"
+FIXTURES_DIR = BASE_DIR / "benchmarks/fixtures"
+IMDB_FIXTURE = FIXTURES_DIR / "imdb_criticreviews_tt0468569.html"
+METACRITIC_FIXTURE = FIXTURES_DIR / "metacritic_critic_reviews_the-dark-knight.html"
+
+STAGES = ["scrape_parse", "feature_build", "etl_load", "view_query", "train", "predict"]
+DEFAULT_REPEATS = 3
+DEFAULT_PAGES = 200  # páginas parseadas por repetição em scrape_parse
+BENCH_DB = f"{BENCH_DB_PREFIX}_pipeline"
+
+# Features, rótulo e parâmetros do CatBoost vêm da definição única em
+# machine-learning/src/pipeline.py (as mesmas do notebook 05_master_pipeline)
+if str(ML_DIR) not in sys.path:
+    sys.path.insert(0, str(ML_DIR))
+from src.pipeline import CATBOOST_PARAMS, NUMERIC_FEATURES, TARGET  # noqa: E402
+
+# ============================================================================
+# MODELO (notebook 05)
+# ============================================================================
+
+def build_model(kind: str = "catboost"):
+    """
+    Pipeline do notebook 05: imputação pela mediana + StandardScaler + classificador.
+    `hist_gb` é uma alternativa sem CatBoost (tempos não comparáveis com `catboost`).
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if kind == "catboost":
+        from catboost import CatBoostClassifier
+        classifier = CatBoostClassifier(**CATBOOST_PARAMS)
+    elif kind == "hist_gb":
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        classifier = HistGradientBoostingClassifier(learning_rate=0.03, max_depth=6, class_weight='balanced', random_state=42)
+    else:
+        raise ValueError(f"Modelo desconhecido: {kind}")
+
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler())
+    ])
+    preprocessor = ColumnTransformer(transformers=[('num', numeric_transformer, NUMERIC_FEATURES)])
+    return Pipeline(steps=[('preprocessor', preprocessor), ('classifier', classifier)])
+
+
+def _engine(dbname: str):
+    from sqlalchemy import URL, create_engine
+
+    settings = db_settings(dbname)
+    return create_engine(URL.create(
+        "postgresql+psycopg2",
+        username=settings["user"],
+        password=settings["password"],
+        host=settings["host"],
+        port=int(settings["port"]),
+        database=settings["dbname"],
+    ))
+
+# ============================================================================
+# ETAPAS
+# ============================================================================
+# Cada etapa faz o setup (imports, leitura de entradas) fora da medição e devolve
+# {"items": N, "unit": ..., "durations": [segundos por repetição]}.
+
+def _timed(work: Callable[[], object], repeats: int) -> List[float]:
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        work()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def stage_scrape_parse(ctx: Dict) -> Dict:
+    from data_collection_scripts.metacritic_scraper import parse_critic_scores_html, parse_metacritic_link
+
+    imdb_html = IMDB_FIXTURE.read_text(encoding="utf-8")
+    metacritic_html = METACRITIC_FIXTURE.read_text(encoding="utf-8")
+    imdb_url = "https://www.imdb.com/title/tt0468569/criticreviews/"
+
+    def work():
+        for _ in range(ctx["pages"]):
+            parse_metacritic_link(imdb_html, imdb_url, "tt0468569")
+            parse_critic_scores_html(metacritic_html)
+
+    return {"items": ctx["pages"], "unit": "páginas", "durations": _timed(work, ctx["repeats"]), "synthetic": True}
+
+
+def stage_feature_build(ctx: Dict) -> Dict:
+    from data_collection_scripts.scores_processor import rating_stats_from_scores_map
+
+    with open(ctx["files"]["scores"], "r", encoding="utf-8") as f:
+        scores = json.load(f)
+    durations = _timed(lambda: rating_stats_from_scores_map(scores), ctx["repeats"])
+    return {"items": len(scores), "unit": "filmes", "durations": durations}
+
+
+def stage_etl_load(ctx: Dict) -> Dict:
+    # Um banco novo por execução: uma segunda carga mediria só o caminho de upsert
+    create_bench_database(ctx["dbname"])
+    return {"items": ctx["movies"], "unit": "filmes", "durations": [run_populate(ctx["dbname"], ctx["files"])]}
+
+
+def stage_view_query(ctx: Dict) -> Dict:
+    import pandas as pd
+
+    engine = _engine(ctx["dbname"])
+    rows = []
+    durations = _timed(lambda: rows.append(len(pd.read_sql("SELECT * FROM ml_training_dataset", engine))), ctx["repeats"])
+    engine.dispose()
+    return {"items": rows[-1], "unit": "linhas", "durations": durations}
+
+
+def stage_train(ctx: Dict) -> Dict:
+    import joblib
+    import pandas as pd
+
+    engine = _engine(ctx["dbname"])
+    df_train = pd.read_sql("SELECT * FROM ml_split_train", engine)
+    engine.dispose()
+
+    model = build_model(ctx["model"])
+    durations = _timed(lambda: model.fit(df_train[NUMERIC_FEATURES], df_train[TARGET]), 1)
+    joblib.dump(model, ctx["model_path"])
+    return {"items": len(df_train), "unit": "linhas", "durations": durations}
+
+
+def stage_predict(ctx: Dict) -> Dict:
+    import joblib
+    import pandas as pd
+
+    if not Path(ctx["model_path"]).exists():
+        raise RuntimeError("modelo não encontrado (a etapa train não rodou)")
+    model = joblib.load(ctx["model_path"])
+    engine = _engine(ctx["dbname"])
+    df = pd.read_sql("SELECT * FROM ml_training_dataset_mat", engine)
+    engine.dispose()
+
+    X = df[NUMERIC_FEATURES]
+    durations = _timed(lambda: model.predict_proba(X), ctx["repeats"])
+    return {"items": len(df), "unit": "linhas", "durations": durations}
+
+
+STAGE_FUNCTIONS = {
+    "scrape_parse": stage_scrape_parse,
+    "feature_build": stage_feature_build,
+    "etl_load": stage_etl_load,
+    "view_query": stage_view_query,
+    "train": stage_train,
+    "predict": stage_predict,
+}
+
+# ============================================================================
+# EXECUÇÃO ISOLADA
+# ============================================================================
+
+def peak_rss_mb() -> float:
+    """Maior RSS do processo atual ou de seus filhos já finalizados (ex.: populate_db)."""
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Linux informa em KB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _stage_worker(stage: str, ctx: Dict) -> Dict:
+    os.environ["DB_NAME"] = ctx["dbname"]
+    result = STAGE_FUNCTIONS[stage](ctx)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_stage(stage: str, ctx: Dict) -> Dict:
+    """Roda a etapa em um processo novo (spawn) e resume tempos, vazão e memória."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        try:
+            raw = pool.apply(_stage_worker, (stage, ctx))
+        except (ImportError, RuntimeError) as e:
+            return {"skipped": str(e)}
+
+    durations = raw["durations"]
+    median = statistics.median(durations)
+    return {
+        "items": raw["items"],
+        "unit": raw["unit"],
+        "runs": len(durations),
+        "seconds_min": min(durations),
+        "seconds_median": median,
+        "throughput_per_s": raw["items"] / median if median else None,
+        "latency_ms_per_item": 1000 * median / raw["items"] if raw["items"] else None,
+        "peak_rss_mb": raw["peak_rss_mb"],
+        "synthetic_input": raw.get("synthetic", False),
+    }
+
+# ============================================================================
+# RESULTADOS
+# ============================================================================
+
+def compare_results(old: Dict, new: Dict):
+    """Imprime a razão novo/antigo do tempo mediano e do pico de RSS por etapa."""
+    print(f"\n📊 Comparação {old['commit']} → {new['commit']}")
+    for stage, stats in new["stages"].items():
+        old_stats = old["stages"].get(stage, {})
+        if "seconds_median" not in stats or not old_stats.get("seconds_median"):
+            continue
+        time_ratio = stats["seconds_median"] / old_stats["seconds_median"]
+        rss_ratio = stats["peak_rss_mb"] / old_stats["peak_rss_mb"]
+        flag = "⚠" if time_ratio > 1.2 or rss_ratio > 1.2 else " "
+        print(f"   {flag} {stage:<14} tempo {old_stats['seconds_median']:>8.3f} → {stats['seconds_median']:>8.3f} s ({time_ratio:.2f}×)"
+              f"   RSS {old_stats['peak_rss_mb']:>7.0f} → {stats['peak_rss_mb']:>7.0f} MB ({rss_ratio:.2f}×)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do pipeline (scraping → ETL → views → modelo).")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--movies", type=int, help="Número de filmes do catálogo sintético")
+    size.add_argument("--scale", type=float, default=1.0, help="Multiplicador do tamanho do catálogo real (padrão: 1)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed do catálogo sintético")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Etapas a executar")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Repetições das etapas baratas (ETL e treino rodam 1×)")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="Páginas parseadas por repetição em scrape_parse")
+    parser.add_argument("--model", choices=["catboost", "hist_gb"], default="catboost", help="Classificador do treino")
+    parser.add_argument("--output", type=Path, default=None, help="Arquivo JSON de saída")
+    parser.add_argument("--compare", type=Path, default=None, help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--keep-db", action="store_true", help="Não remover o banco de benchmark")
+    args = parser.parse_args()
+
+    load_dotenv()
+    profile = fit_catalog_profile()
+    n_movies = args.movies or int(round(profile["n_movies"] * args.scale))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "movies": n_movies,
+        "seed": args.seed,
+        "model": args.model,
+        "repeats": args.repeats,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "stages": {},
+    }
+
+    db_stages = {"etl_load", "view_query", "train", "predict"}
+    if db_stages & set(args.stages) and "etl_load" not in args.stages:
+        parser.error("etapas de banco/modelo exigem etl_load (o banco de benchmark é recriado a cada execução)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🎲 Gerando catálogo sintético com {n_movies:,} filmes (seed={args.seed})...")
+        files = generate_catalog(n_movies, Path(tmp), args.seed, profile)
+        ctx = {
+            "files": {kind: str(path) for kind, path in files.items()},
+            "movies": n_movies,
+            "dbname": BENCH_DB,
+            "repeats": args.repeats,
+            "pages": args.pages,
+            "model": args.model,
+            "model_path": str(Path(tmp) / "model.joblib"),
+        }
+
+        try:
+            for stage in STAGES:
+                if stage not in args.stages:
+                    continue
+                print(f"⏱️  {stage}...")
+                stats = run_stage(stage, ctx)
+                report["stages"][stage] = stats
+                if "skipped" in stats:
+                    print(f"   ⚠ ignorada: {stats['skipped']}")
+                else:
+                    synthetic = "  (entrada sintética)" if stats["synthetic_input"] else ""
+                    print(f"   {stats['seconds_median']:>9.3f} s  {stats['throughput_per_s']:>12,.1f} {stats['unit']}/s"
+                          f"  {stats['latency_ms_per_item']:>9.3f} ms/item  pico RSS {stats['peak_rss_mb']:,.0f} MB{synthetic}")
+        finally:
+            if not args.keep_db and db_stages & set(args.stages):
+                drop_bench_database(BENCH_DB)
+
+    output = args.output or RESULTS_DIR / f"pipeline_benchmark_{report['commit']}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados salvos em {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare_results(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
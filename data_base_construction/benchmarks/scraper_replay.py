@@ -0,0 +1,144 @@
+"""
+Scraper Replay - Vazão e corretude do scraper sobre páginas gravadas (sem rede)
+
+Roda get_metacritic_critic_scores_from_id em modo replay (scraper_archive.py) para
+os filmes gravados, com o mesmo paralelismo por threads do db_unifier, e compara
+as notas extraídas com data/processed/movie_scores.json.
+
+Para gravar as páginas antes (uma vez, com rede):
+    SCRAPER_ARCHIVE_MODE=record python -m db_populate_scipts.db_unifier
+
+Uso (a partir de data_base_construction/):
+    python -m benchmarks.scraper_replay
+    python -m benchmarks.scraper_replay --workers 1 2 4 8 --limit 50
+    python -m benchmarks.scraper_replay --profiles full light   # confere que o perfil leve não muda as notas
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.view_benchmark import RESULTS_DIR, git_commit
+
+# Replay precisa estar ligado antes de o scraper montar sessions/contextos
+os.environ["SCRAPER_ARCHIVE_MODE"] = "replay"
+
+from data_collection_scripts.metacritic_scraper import get_metacritic_critic_scores_from_id  # noqa: E402
+from data_collection_scripts.scraper_archive import archive_dir, recorded_imdb_ids  # noqa: E402
+from data_collection_scripts.scraping_profile import PROFILES  # noqa: E402
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # data_base_construction/
+SCORES_JSON = BASE_DIR / "data/processed/movie_scores.json"
+DEFAULT_WORKERS = [8]  # mesmo MAX_WORKERS do db_unifier
+
+# ============================================================================
+# REPLAY
+# ============================================================================
+
+def _fetch(imdb_id: str):
+    start = time.perf_counter()
+    _, scores, status = get_metacritic_critic_scores_from_id(imdb_id, with_status=True)
+    return imdb_id, scores, status, time.perf_counter() - start
+
+
+def replay(imdb_ids: List[str], workers: int, expected: Dict[str, List[int]]) -> Tuple[Dict, Dict[str, List[int]]]:
+    """Reproduz os filmes com `workers` threads; retorna (resumo, notas extraídas por filme)."""
+    scores_by_id = {}
+    latencies = []
+    mismatches = []
+    partial = {}
+    errors = {}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_fetch, imdb_id): imdb_id for imdb_id in imdb_ids}
+        for future in as_completed(futures):
+            imdb_id = futures[future]
+            try:
+                _, scores, status, seconds = future.result()
+            except Exception as e:
+                errors[imdb_id] = f"{type(e).__name__}: {e}"
+                continue
+            latencies.append(seconds)
+            scores_by_id[imdb_id] = scores
+            if status != "complete":
+                partial[imdb_id] = status
+            if imdb_id in expected and expected[imdb_id] != scores:
+                mismatches.append(imdb_id)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "profile": os.environ["SCRAPER_PROFILE"],
+        "workers": workers,
+        "titles": len(imdb_ids),
+        "seconds": elapsed,
+        "titles_per_s": len(latencies) / elapsed if elapsed else None,
+        "latency_s_median": statistics.median(latencies) if latencies else None,
+        "latency_s_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+        "mismatches": mismatches,
+        "partial": partial,
+        "errors": errors,
+    }, scores_by_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do scraper a partir de páginas gravadas.")
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS, help="Threads paralelas a testar")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=["full"],
+                        help="Perfis de navegação (scraping_profile.py); notas são comparadas entre eles")
+    parser.add_argument("--limit", type=int, default=None, help="Máximo de filmes reproduzidos")
+    parser.add_argument("--output", type=Path, default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args()
+
+    imdb_ids = recorded_imdb_ids()[:args.limit]
+    if not imdb_ids:
+        print(f"❌ Nenhuma página gravada em {archive_dir()} (rode antes com SCRAPER_ARCHIVE_MODE=record)")
+        return
+
+    with open(SCORES_JSON, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "archive": str(archive_dir()),
+        "runs": [],
+    }
+    print(f"🎬 Reproduzindo {len(imdb_ids)} filmes de {archive_dir()}")
+    baseline = None  # notas do primeiro perfil, referência para os demais
+    for profile in args.profiles:
+        os.environ["SCRAPER_PROFILE"] = profile
+        for workers in args.workers:
+            result, scores_by_id = replay(imdb_ids, workers, expected)
+            if baseline is None:
+                baseline = scores_by_id
+            result["profile_mismatches"] = sorted(
+                imdb_id for imdb_id, scores in scores_by_id.items() if imdb_id in baseline and baseline[imdb_id] != scores
+            )
+            report["runs"].append(result)
+            latency = (f"mediana {result['latency_s_median']:.2f}s  p95 {result['latency_s_p95']:.2f}s"
+                       if result["latency_s_median"] is not None else "sem sucessos")
+            print(f"   {profile:<6} {workers:>3} threads: {result['titles_per_s']:.2f} filmes/s  {latency}  "
+                  f"divergências {len(result['mismatches'])}/{len(result['profile_mismatches'])} (json/perfil)  "
+                  f"parciais {len(result['partial'])}  erros {len(result['errors'])}")
+
+    output = args.output or RESULTS_DIR / f"scraper_replay_{report['commit']}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
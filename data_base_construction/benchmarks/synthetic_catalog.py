@@ -0,0 +1,362 @@
+"""
+Synthetic Catalog - Gerador de catálogo e notas sintéticas para testes em escala
+
+Gera um CSV com exatamente as colunas (em português) que o populate_db.py espera
+e um JSON {imdb_id: [notas]} compatível com movie_scores.json. As distribuições
+(anos, indicações, notas IMDb, votos, duração, gêneros, países, idiomas,
+quantidade de pessoas por papel, valores monetários, número de reviews e notas
+dos críticos) são ajustadas a partir dos dados reais. Tudo é determinístico
+pela seed e escrito em blocos, sem manter o catálogo inteiro em memória.
+
+Uso (a partir de data_base_construction/):
+    python -m benchmarks.synthetic_catalog --movies 330000 --seed 42
+    python -m benchmarks.synthetic_catalog --scale 10 --out-dir /tmp/catalog_10x
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # data_base_construction/
+CSV_FILE = BASE_DIR / "data/raw/movies_catalog_oscar_and_popular_2000_2025.csv"
+SCORES_JSON = BASE_DIR / "data/processed/movie_scores.json"
+OUTPUT_DIR = BASE_DIR / "data/synthetic"
+
+DEFAULT_SEED = 42
+CHUNK_SIZE = 10_000  # filmes gerados/escritos por bloco
+
+# Colunas exatas do CSV lidas por populate_db.py (na mesma ordem do catálogo real)
+CSV_COLUMNS = [
+    "ID IMDb", "Título Original", "Título Brasileiro", "Ano Lançamento", "Nota IMDb", "Votos",
+    "Duração (min)", "Indicado Oscar", "Vencedor Oscar", "Ano Cerimônia Oscar", "Status Oscar",
+    "Gêneros", "Diretores", "Roteiristas", "Elenco Principal", "Países", "Idiomas",
+    "Orçamento", "Bilheteria Mundial", "Bilheteria Doméstica", "Metascore", "Sinopse",
+]
+
+# Colunas multivaloradas (separadas por vírgula)
+CATEGORICAL_COLUMNS = {"genres": "Gêneros", "countries": "Países", "languages": "Idiomas"}
+PEOPLE_COLUMNS = {"directors": "Diretores", "writers": "Roteiristas", "cast": "Elenco Principal"}
+MONEY_COLUMNS = {"budget": "Orçamento", "worldwide_gross": "Bilheteria Mundial", "domestic_gross": "Bilheteria Doméstica"}
+
+# ============================================================================
+# AJUSTE AOS DADOS REAIS
+# ============================================================================
+
+def _split_values(value) -> List[str]:
+    if pd.isna(value):
+        return []
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def _parse_money(value) -> float:
+    if pd.isna(value) or value == "":
+        return float("nan")
+    clean = re.sub(r"[^0-9.]", "", str(value))
+    return float(clean) if clean else float("nan")
+
+
+def _empirical(values) -> Dict[str, List]:
+    """Distribuição empírica {valores, probabilidades} de uma sequência discreta."""
+    counts = Counter(values)
+    total = sum(counts.values())
+    keys = sorted(counts)
+    return {"values": keys, "probs": [counts[k] / total for k in keys]}
+
+
+def fit_catalog_profile(csv_path: Path = CSV_FILE, scores_path: Path = SCORES_JSON) -> Dict:
+    """
+    Extrai do catálogo e das notas reais as distribuições usadas pelo gerador.
+    Retorna um dicionário serializável em JSON.
+    """
+    df = pd.read_csv(csv_path)
+    with open(scores_path, "r", encoding="utf-8") as f:
+        scores = json.load(f)
+
+    nominated = df["Indicado Oscar"].str.strip().str.lower() == "sim"
+    won = df["Vencedor Oscar"].str.strip().str.lower() == "sim"
+
+    profile: Dict = {
+        "n_movies": int(len(df)),
+        "years": _empirical(df["Ano Lançamento"].astype(int).tolist()),
+        "nominated_rate_by_year": nominated.groupby(df["Ano Lançamento"]).mean().round(6).to_dict(),
+        "win_rate_given_nominated": float(won[nominated].mean()),
+        "imdb_rating": df["Nota IMDb"].dropna().tolist(),
+        "log_votes": np.log1p(df["Votos"].dropna()).tolist(),
+        "runtime": df["Duração (min)"].dropna().astype(int).tolist(),
+        "metascore": df["Metascore"].dropna().astype(int).tolist(),
+        "metascore_missing_rate": float(df["Metascore"].isna().mean()),
+    }
+
+    # Gêneros/países/idiomas: quantidade por filme + frequência de cada valor
+    for key, col in CATEGORICAL_COLUMNS.items():
+        lists = df[col].map(_split_values)
+        profile[f"{key}_count"] = _empirical(lists.map(len).tolist())
+        profile[f"{key}_values"] = _empirical([v for values in lists for v in values])
+
+    # Pessoas: quantidade por filme/papel + tamanho do universo de pessoas por filme
+    # e número de filmes por pessoa (cauda longa: poucos nomes muito frequentes)
+    appearances = Counter()
+    for key, col in PEOPLE_COLUMNS.items():
+        lists = df[col].map(_split_values)
+        profile[f"{key}_count"] = _empirical(lists.map(len).tolist())
+        appearances.update(v for values in lists for v in values)
+    profile["people_per_movie"] = len(appearances) / len(df)
+    profile["people_appearances"] = sorted(appearances.values(), reverse=True)
+
+    # Valores monetários (log) e taxa de ausência
+    for key, col in MONEY_COLUMNS.items():
+        values = df[col].map(_parse_money)
+        profile[f"{key}_missing_rate"] = float(values.isna().mean())
+        profile[f"log_{key}"] = np.log1p(values.dropna()).tolist()
+
+    # Sinopses: vocabulário e tamanho (em palavras)
+    words = df["Sinopse"].fillna("").str.findall(r"[A-Za-z']+")
+    profile["synopsis_length"] = words.map(len).tolist()
+    profile["synopsis_vocab"] = _empirical([w.lower() for ws in words for w in ws])
+
+    # Reviews: cobertura, quantidade por filme (indicados x não indicados), média e desvio
+    metascore_by_id = dict(zip(df["ID IMDb"], df["Metascore"]))
+    nominated_ids = set(df.loc[nominated, "ID IMDb"])
+    n_reviews = {True: [], False: []}
+    mean_residuals, means, stds = [], [], []
+    for imdb_id, samples in scores.items():
+        if not samples:
+            continue
+        arr = np.asarray(samples, dtype=float)
+        n_reviews[imdb_id in nominated_ids].append(int(arr.size))
+        means.append(float(arr.mean()))
+        stds.append(float(arr.std()))
+        metascore = metascore_by_id.get(imdb_id)
+        if metascore is not None and not pd.isna(metascore):
+            mean_residuals.append(float(arr.mean() - metascore))
+
+    # Críticos costumam dar notas "redondas" (ex.: 4/5 estrelas → 80)
+    all_scores = np.concatenate([np.asarray(v, dtype=int) for v in scores.values() if v])
+    profile["score_round10_rate"] = float((all_scores % 10 == 0).mean())
+    profile["score_round5_rate"] = float(((all_scores % 5 == 0) & (all_scores % 10 != 0)).mean())
+
+    profile["scores_coverage"] = sum(1 for v in scores.values() if v) / len(df)
+    profile["n_reviews_nominated"] = n_reviews[True]
+    profile["n_reviews_other"] = n_reviews[False]
+    profile["score_mean"] = means
+    profile["score_mean_minus_metascore"] = mean_residuals
+    profile["score_std"] = stds
+    return profile
+
+# ============================================================================
+# GERAÇÃO
+# ============================================================================
+
+class _Sampler:
+    """Amostragem vetorizada a partir do perfil ajustado."""
+
+    def __init__(self, profile: Dict, n_movies: int, rng: np.random.Generator):
+        self.profile = profile
+        self.rng = rng
+
+        self.people_pool = max(100, int(profile["people_per_movie"] * n_movies))
+        # Cada pessoa recebe um peso sorteado da distribuição real de filmes por pessoa
+        weights = rng.choice(np.asarray(profile["people_appearances"], dtype=float), size=self.people_pool)
+        self.people_cdf = np.cumsum(weights / weights.sum())
+
+        vocab = profile["synopsis_vocab"]
+        self.vocab = np.asarray(vocab["values"])
+        self.vocab_probs = np.asarray(vocab["probs"])
+
+    def empirical(self, key: str, size: int) -> np.ndarray:
+        dist = self.profile[key]
+        return self.rng.choice(np.asarray(dist["values"]), size=size, p=np.asarray(dist["probs"]))
+
+    def bootstrap(self, key: str, size: int, jitter: float = 0.0) -> np.ndarray:
+        values = self.rng.choice(np.asarray(self.profile[key], dtype=float), size=size)
+        if jitter:
+            values = values + self.rng.normal(0.0, jitter, size=size)
+        return values
+
+    def people(self, size: int) -> np.ndarray:
+        idx = np.searchsorted(self.people_cdf, self.rng.random(size))
+        return np.minimum(idx, self.people_pool - 1)
+
+    def multi_values(self, count_key: str, values_key: str, size: int) -> List[str]:
+        counts = self.empirical(count_key, size)
+        values = self.empirical(values_key, int(counts.sum()))
+        out, pos = [], 0
+        for count in counts:
+            # dict.fromkeys remove repetidos mantendo a ordem
+            out.append(", ".join(dict.fromkeys(values[pos:pos + count])))
+            pos += count
+        return out
+
+    def multi_people(self, count_key: str, size: int) -> List[str]:
+        counts = self.empirical(count_key, size)
+        ids = self.people(int(counts.sum()))
+        out, pos = [], 0
+        for count in counts:
+            names = dict.fromkeys(f"Person {pid:07d}" for pid in ids[pos:pos + count])
+            out.append(", ".join(names))
+            pos += count
+        return out
+
+    def money(self, key: str, size: int) -> List[Optional[str]]:
+        values = np.expm1(self.bootstrap(f"log_{key}", size, jitter=0.15))
+        missing = self.rng.random(size) < self.profile[f"{key}_missing_rate"]
+        return [None if miss else f"USD {int(v):,}" for v, miss in zip(values, missing)]
+
+    def synopsis(self, size: int) -> List[str]:
+        lengths = np.maximum(self.bootstrap("synopsis_length", size).astype(int), 5)
+        words = self.rng.choice(self.vocab, size=int(lengths.sum()), p=self.vocab_probs)
+        out, pos = [], 0
+        for length in lengths:
+            text = " ".join(words[pos:pos + length])
+            out.append(text[:1].upper() + text[1:] + ".")
+            pos += length
+        return out
+
+
+def _generate_chunk(sampler: _Sampler, start: int, size: int) -> pd.DataFrame:
+    profile, rng = sampler.profile, sampler.rng
+
+    years = sampler.empirical("years", size).astype(int)
+    nominated_rate = np.asarray([profile["nominated_rate_by_year"].get(y, 0.0) for y in years])
+    nominated = rng.random(size) < nominated_rate
+    won = nominated & (rng.random(size) < profile["win_rate_given_nominated"])
+
+    metascore = np.clip(np.rint(sampler.bootstrap("metascore", size, jitter=3.0)), 1, 100)
+    metascore_missing = rng.random(size) < profile["metascore_missing_rate"]
+
+    ids = [f"tt9{i:08d}" for i in range(start, start + size)]
+    titles = [f"Synthetic Movie {i}" for i in range(start, start + size)]
+
+    return pd.DataFrame({
+        "ID IMDb": ids,
+        "Título Original": titles,
+        "Título Brasileiro": [f"Filme Sintético {i}" for i in range(start, start + size)],
+        "Ano Lançamento": years,
+        "Nota IMDb": np.clip(np.round(sampler.bootstrap("imdb_rating", size, jitter=0.2), 1), 1.0, 10.0),
+        "Votos": np.expm1(sampler.bootstrap("log_votes", size, jitter=0.1)).astype(int),
+        "Duração (min)": np.maximum(np.rint(sampler.bootstrap("runtime", size, jitter=4.0)), 40).astype(int),
+        "Indicado Oscar": np.where(nominated, "Sim", "Não"),
+        "Vencedor Oscar": np.where(won, "Sim", "Não"),
+        "Ano Cerimônia Oscar": pd.array(np.where(nominated, years + 1, np.nan), dtype="Int64"),
+        "Status Oscar": np.where(won, "🏆 Vencedor", np.where(nominated, "🎬 Indicado", None)),
+        "Gêneros": sampler.multi_values("genres_count", "genres_values", size),
+        "Diretores": sampler.multi_people("directors_count", size),
+        "Roteiristas": sampler.multi_people("writers_count", size),
+        "Elenco Principal": sampler.multi_people("cast_count", size),
+        "Países": sampler.multi_values("countries_count", "countries_values", size),
+        "Idiomas": sampler.multi_values("languages_count", "languages_values", size),
+        "Orçamento": sampler.money("budget", size),
+        "Bilheteria Mundial": sampler.money("worldwide_gross", size),
+        "Bilheteria Doméstica": sampler.money("domestic_gross", size),
+        "Metascore": pd.array(np.where(metascore_missing, np.nan, metascore), dtype="Int64"),
+        "Sinopse": sampler.synopsis(size),
+    })[CSV_COLUMNS]
+
+
+def _generate_scores(sampler: _Sampler, chunk: pd.DataFrame) -> Dict[str, List[int]]:
+    """Notas dos críticos coerentes com o Metascore e com o status de indicação de cada filme."""
+    profile, rng = sampler.profile, sampler.rng
+    size = len(chunk)
+    covered = rng.random(size) < profile["scores_coverage"]
+    nominated = (chunk["Indicado Oscar"] == "Sim").to_numpy()
+
+    n_nominated = sampler.bootstrap("n_reviews_nominated", size).astype(int)
+    n_other = sampler.bootstrap("n_reviews_other", size).astype(int)
+    n_reviews = np.where(nominated, n_nominated, n_other)
+
+    metascore = chunk["Metascore"].to_numpy(dtype=float)
+    centers = np.where(
+        np.isnan(metascore),
+        sampler.bootstrap("score_mean", size),
+        metascore + sampler.bootstrap("score_mean_minus_metascore", size),
+    )
+    spreads = sampler.bootstrap("score_std", size)
+    round10, round5 = profile["score_round10_rate"], profile["score_round5_rate"]
+
+    scores: Dict[str, List[int]] = {}
+    for imdb_id, ok, n, center, spread in zip(chunk["ID IMDb"], covered, n_reviews, centers, spreads):
+        if not ok or n <= 0:
+            continue
+        samples = rng.normal(center, spread, size=n)
+        rounding = rng.random(n)
+        step = np.where(rounding < round10, 10, np.where(rounding < round10 + round5, 5, 1))
+        samples = np.clip(np.rint(samples / step) * step, 0, 100).astype(int)
+        scores[imdb_id] = sorted(samples.tolist(), reverse=True)
+    return scores
+
+
+def generate_catalog(
+    n_movies: int,
+    out_dir: Path = OUTPUT_DIR,
+    seed: int = DEFAULT_SEED,
+    profile: Optional[Dict] = None,
+    chunk_size: int = CHUNK_SIZE,
+    prefix: str = "synthetic",
+) -> Dict[str, Path]:
+    """
+    Gera `n_movies` filmes sintéticos em blocos e grava:
+    - <prefix>_catalog.csv (colunas de populate_db.py)
+    - <prefix>_scores.json ({imdb_id: [notas]})
+    - <prefix>_errors.json (vazio, para o argumento --errors do populate_db)
+    Retorna os caminhos gerados.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    profile = profile or fit_catalog_profile()
+    rng = np.random.default_rng(seed)
+    sampler = _Sampler(profile, n_movies, rng)
+
+    csv_path = out_dir / f"{prefix}_catalog.csv"
+    scores_path = out_dir / f"{prefix}_scores.json"
+    errors_path = out_dir / f"{prefix}_errors.json"
+
+    first_score = True
+    with open(csv_path, "w", encoding="utf-8", newline="") as csv_file, \
+         open(scores_path, "w", encoding="utf-8") as scores_file:
+        scores_file.write("{")
+        for start in range(0, n_movies, chunk_size):
+            chunk = _generate_chunk(sampler, start, min(chunk_size, n_movies - start))
+            chunk.to_csv(csv_file, index=False, header=(start == 0))
+
+            # JSON escrito incrementalmente (um filme por linha)
+            for imdb_id, samples in _generate_scores(sampler, chunk).items():
+                scores_file.write(("\n" if first_score else ",\n") + json.dumps(imdb_id) + ": " + json.dumps(samples))
+                first_score = False
+        scores_file.write("\n}\n")
+
+    with open(errors_path, "w", encoding="utf-8") as f:
+        json.dump({}, f)
+
+    return {"csv": csv_path, "scores": scores_path, "errors": errors_path}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera catálogo e notas sintéticas no formato do populate_db.py.")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--movies", type=int, help="Número de filmes a gerar")
+    size.add_argument("--scale", type=float, default=1.0, help="Multiplicador do tamanho do catálogo real (padrão: 1)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed do gerador (padrão: 42)")
+    parser.add_argument("--out-dir", type=Path, default=OUTPUT_DIR, help="Diretório de saída")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Filmes por bloco escrito")
+    args = parser.parse_args()
+
+    profile = fit_catalog_profile()
+    n_movies = args.movies or int(round(profile["n_movies"] * args.scale))
+    print(f"🎲 Gerando {n_movies:,} filmes sintéticos (seed={args.seed})...")
+    paths = generate_catalog(n_movies, args.out_dir, args.seed, profile, args.chunk_size)
+    for kind, path in paths.items():
+        print(f"💾 {kind}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+View Benchmark - Planos e tempos das views do schema.sql em escala
+
+Carrega catálogos sintéticos (1×, 10×, 100× o CSV real) em bancos PostgreSQL
+descartáveis usando o caminho real (schema.sql + populate_db.py), executa cada
+view sob EXPLAIN (ANALYZE, BUFFERS) e grava tempos e formato dos planos em JSON,
+para comparar resultados entre commits.
+
+Uso (a partir de data_base_construction/):
+    python -m benchmarks.view_benchmark
+    python -m benchmarks.view_benchmark --scales 1 10 --repeats 5
+    python -m benchmarks.view_benchmark --compare benchmarks/results/view_benchmark_<antigo>.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import psycopg2
+from dotenv import load_dotenv
+
+from benchmarks.synthetic_catalog import fit_catalog_profile, generate_catalog
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # data_base_construction/
+SCHEMA_SQL = BASE_DIR / "schema.sql"
+RESULTS_DIR = BASE_DIR / "benchmarks/results"
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_REPEATS = 3
+BENCH_DB_PREFIX = "moviesdb_bench"
+
+# Relações medidas (SELECT * FROM <relação>)
+BENCHMARK_RELATIONS = [
+    "movie_rating_stats",
+    "ml_training_dataset",
+    "ml_training_dataset_mat",
+    "ml_split_train",
+    "ml_split_validation",
+    "ml_split_test",
+    "ml_split_prediction_2025",
+]
+
+# ============================================================================
+# DADOS SINTÉTICOS
+# ============================================================================
+
+def build_scaled_catalog(scale: int, out_dir: Path) -> Dict[str, Path]:
+    """
+    Gera um catálogo sintético com `scale` vezes o tamanho do real (synthetic_catalog.py).
+    As pessoas seguem a distribuição real de filmes por pessoa, então o histórico de
+    cada uma não cresce artificialmente com a escala.
+    """
+    n_movies = int(round(fit_catalog_profile()["n_movies"] * scale))
+    return generate_catalog(n_movies, out_dir, prefix=f"catalog_{scale}x")
+
+# ============================================================================
+# BANCO DE DADOS
+# ============================================================================
+
+def db_settings(dbname: str) -> Dict[str, str]:
+    """Credenciais do .env (mesmos defaults de data_loader.py) para o banco informado."""
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": os.getenv("DB_PORT", "5432"),
+        "dbname": dbname,
+        "user": os.getenv("DB_USER", "postgres"),
+        "password": os.getenv("DB_PASSWORD", "postgres"),
+    }
+
+
+def create_bench_database(dbname: str):
+    """Recria o banco de benchmark do zero e aplica o schema.sql."""
+    admin = psycopg2.connect(**db_settings("postgres"))
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f'DROP DATABASE IF EXISTS "{dbname}"')
+        cur.execute(f'CREATE DATABASE "{dbname}"')
+    admin.close()
+
+    conn = psycopg2.connect(**db_settings(dbname))
+    with conn.cursor() as cur:
+        cur.execute(SCHEMA_SQL.read_text(encoding="utf-8"))
+    conn.commit()
+    conn.close()
+
+
+def drop_bench_database(dbname: str):
+    admin = psycopg2.connect(**db_settings("postgres"))
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f'DROP DATABASE IF EXISTS "{dbname}"')
+    admin.close()
+
+
+def run_populate(dbname: str, files: Dict[str, Path]) -> float:
+    """Executa populate_db.py (mesmo caminho do ETL real) e retorna o tempo em segundos."""
+    env = dict(os.environ, DB_NAME=dbname)
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "db_populate_scipts.populate_db",
+         "--csv", str(files["csv"]), "--scores", str(files["scores"]), "--errors", str(files["errors"])],
+        cwd=BASE_DIR, env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+# ============================================================================
+# EXPLAIN (ANALYZE, BUFFERS)
+# ============================================================================
+
+def plan_shape(node: Dict) -> str:
+    """Resumo do plano: 'Tipo do nó [relação](filhos...)'."""
+    label = node["Node Type"]
+    if "Relation Name" in node:
+        label += f" [{node['Relation Name']}]"
+    if "Index Name" in node:
+        label += f" <{node['Index Name']}>"
+    children = node.get("Plans", [])
+    if children:
+        label += "(" + ", ".join(plan_shape(child) for child in children) + ")"
+    return label
+
+
+def explain_relation(cur, relation: str, repeats: int) -> Dict:
+    """Executa EXPLAIN (ANALYZE, BUFFERS) `repeats` vezes e resume tempos/buffers."""
+    execution_ms: List[float] = []
+    planning_ms: List[float] = []
+    plan = None
+    for _ in range(repeats):
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT * FROM {relation}")
+        result = cur.fetchone()[0][0]
+        execution_ms.append(result["Execution Time"])
+        planning_ms.append(result["Planning Time"])
+        plan = result["Plan"]
+
+    return {
+        "rows": plan["Actual Rows"],
+        "execution_ms_min": min(execution_ms),
+        "execution_ms_median": statistics.median(execution_ms),
+        "planning_ms_median": statistics.median(planning_ms),
+        "shared_hit_blocks": plan.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": plan.get("Shared Read Blocks", 0),
+        "temp_written_blocks": plan.get("Temp Written Blocks", 0),
+        "plan_shape": plan_shape(plan),
+    }
+
+
+def benchmark_scale(scale: int, repeats: int, work_dir: Path, keep_db: bool) -> Dict:
+    dbname = f"{BENCH_DB_PREFIX}_{scale}x"
+    print(f"\n📦 Escala {scale}×: gerando catálogo sintético...")
+    files = build_scaled_catalog(scale, work_dir)
+
+    create_bench_database(dbname)
+    print(f"🗄️  Carregando via populate_db ({dbname})...")
+    load_seconds = run_populate(dbname, files)
+
+    conn = psycopg2.connect(**db_settings(dbname))
+    conn.autocommit = True
+    result = {"load_seconds": load_seconds, "relations": {}}
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM movies")
+        result["movies"] = cur.fetchone()[0]
+
+        start = time.perf_counter()
+        cur.execute("SELECT refresh_ml_training_dataset()")
+        result["refresh_seconds"] = time.perf_counter() - start
+
+        for relation in BENCHMARK_RELATIONS:
+            stats = explain_relation(cur, relation, repeats)
+            result["relations"][relation] = stats
+            print(f"   {relation:<28} {stats['execution_ms_median']:>10.1f} ms  ({stats['rows']:,} linhas)")
+    conn.close()
+
+    if not keep_db:
+        drop_bench_database(dbname)
+    return result
+
+# ============================================================================
+# RESULTADOS
+# ============================================================================
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare_results(old: Dict, new: Dict):
+    """Imprime a razão novo/antigo do tempo mediano por relação e escala."""
+    print(f"\n📊 Comparação {old['commit']} → {new['commit']} (razão do tempo mediano)")
+    for scale, new_scale in new["scales"].items():
+        old_scale = old["scales"].get(scale)
+        if not old_scale:
+            continue
+        print(f"  Escala {scale}×")
+        for relation, stats in new_scale["relations"].items():
+            old_stats = old_scale["relations"].get(relation)
+            if not old_stats or not old_stats["execution_ms_median"]:
+                continue
+            ratio = stats["execution_ms_median"] / old_stats["execution_ms_median"]
+            flag = "⚠" if ratio > 1.2 else " "
+            print(f"   {flag} {relation:<28} {old_stats['execution_ms_median']:>10.1f} → "
+                  f"{stats['execution_ms_median']:>10.1f} ms  ({ratio:.2f}×)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das views do schema.sql em catálogos sintéticos.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="Multiplicadores do catálogo real")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Execuções de EXPLAIN ANALYZE por view")
+    parser.add_argument("--output", type=Path, default=None, help="Arquivo JSON de saída")
+    parser.add_argument("--compare", type=Path, default=None, help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--keep-db", action="store_true", help="Não remover os bancos de benchmark")
+    args = parser.parse_args()
+
+    load_dotenv()
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "repeats": args.repeats,
+        "scales": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            report["scales"][str(scale)] = benchmark_scale(scale, args.repeats, Path(tmp), args.keep_db)
+
+    output = args.output or RESULTS_DIR / f"view_benchmark_{report['commit']}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados salvos em {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare_results(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
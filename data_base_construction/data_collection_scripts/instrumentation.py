@@ -0,0 +1,211 @@
+"""
+Instrumentação - Spans de tempo para a coleta (scraper, db_unifier) e o ETL (populate_db)
+
+Desligada por padrão: span() devolve um objeto no-op compartilhado, então o custo
+no caminho quente é só a checagem de um booleano. Para ligar, defina as variáveis
+de ambiente abaixo (lidas na importação) ou chame configure():
+
+    PIPELINE_TRACE_FILE    JSONL com um registro por span (nome, início, duração, atributos)
+    PIPELINE_METRICS_FILE  histogramas por span no formato texto do Prometheus
+                           (compatível com o textfile collector do node_exporter)
+
+Uso:
+    from data_collection_scripts import instrumentation as instr
+
+    with instr.span("imdb_fetch", imdb_id=imdb_id) as s:
+        ...
+        s.set(status=resp.status_code)
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+METRIC_NAME = "imdb_pipeline_span_seconds"
+# Limites dos buckets (segundos): de inserts rápidos até páginas que travam
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+_enabled = False
+_trace_file = None
+_metrics_path: Optional[str] = None
+_histograms: Dict[str, Dict] = {}
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+class _NoopSpan:
+    """Span usado quando a instrumentação está desligada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "start", "wall_start")
+
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _record(self.name, duration, self.wall_start, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Acrescenta atributos conhecidos só durante o span (ex.: quantidade de linhas)."""
+        self.attrs.update(attrs)
+
+
+def span(name: str, **attrs):
+    """Context manager que mede o bloco e registra em trace/métricas (no-op se desligado)."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name, attrs)
+
+
+def record(name: str, seconds: float, **attrs):
+    """Registra uma duração medida fora de um span (ex.: subprocessos)."""
+    if _enabled:
+        _record(name, seconds, time.time() - seconds, attrs)
+
+
+def _record(name: str, seconds: float, wall_start: float, attrs: Dict):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0, "max": 0.0, "errors": 0}
+        for i, limit in enumerate(BUCKETS):
+            if seconds <= limit:
+                hist["buckets"][i] += 1
+                break
+        hist["count"] += 1
+        hist["sum"] += seconds
+        hist["max"] = max(hist["max"], seconds)
+        if "error" in attrs:
+            hist["errors"] += 1
+
+        if _trace_file is not None:
+            entry = {
+                "ts": round(wall_start, 6),
+                "span": name,
+                "duration_ms": round(seconds * 1000, 3),
+                "thread": threading.current_thread().name,
+                **attrs,
+            }
+            _trace_file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+# ============================================================================
+# CONFIGURAÇÃO E EXPORTAÇÃO
+# ============================================================================
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def configure(trace_file: Optional[str] = None, metrics_file: Optional[str] = None):
+    """Liga a instrumentação se trace_file e/ou metrics_file forem informados."""
+    global _enabled, _trace_file, _metrics_path
+    with _lock:
+        if trace_file:
+            if _trace_file is not None:
+                _trace_file.close()
+            os.makedirs(os.path.dirname(os.path.abspath(trace_file)), exist_ok=True)
+            # Append + buffer de linha: execuções longas podem ser acompanhadas com tail -f
+            _trace_file = open(trace_file, "a", encoding="utf-8", buffering=1)
+        if metrics_file:
+            _metrics_path = metrics_file
+        _enabled = _trace_file is not None or _metrics_path is not None
+
+
+def configure_from_env():
+    configure(os.getenv("PIPELINE_TRACE_FILE"), os.getenv("PIPELINE_METRICS_FILE"))
+
+
+def summary() -> Dict[str, Dict]:
+    """Totais por span, do que mais consumiu tempo para o que menos consumiu."""
+    with _lock:
+        items = sorted(_histograms.items(), key=lambda kv: kv[1]["sum"], reverse=True)
+        return {
+            name: {
+                "count": hist["count"],
+                "total_s": hist["sum"],
+                "mean_ms": 1000 * hist["sum"] / hist["count"],
+                "max_ms": 1000 * hist["max"],
+                "errors": hist["errors"],
+            }
+            for name, hist in items
+        }
+
+
+def render_metrics() -> str:
+    """Histogramas no formato texto do Prometheus (um label `span` por etapa)."""
+    lines = [
+        f"# HELP {METRIC_NAME} Duração dos spans do pipeline (coleta e ETL).",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    with _lock:
+        for name, hist in sorted(_histograms.items()):
+            cumulative = 0
+            for limit, count in zip(BUCKETS, hist["buckets"]):
+                cumulative += count
+                lines.append(f'{METRIC_NAME}_bucket{{span="{name}",le="{limit}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{span="{name}",le="+Inf"}} {hist["count"]}')
+            lines.append(f'{METRIC_NAME}_sum{{span="{name}"}} {hist["sum"]:.6f}')
+            lines.append(f'{METRIC_NAME}_count{{span="{name}"}} {hist["count"]}')
+        lines.append(f"# HELP {METRIC_NAME}_errors_total Spans encerrados com exceção.")
+        lines.append(f"# TYPE {METRIC_NAME}_errors_total counter")
+        for name, hist in sorted(_histograms.items()):
+            lines.append(f'{METRIC_NAME}_errors_total{{span="{name}"}} {hist["errors"]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: Optional[str] = None):
+    """Grava as métricas (substituição atômica, para o coletor nunca ler arquivo parcial)."""
+    path = path or _metrics_path
+    if not _enabled or not path:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_file = f"{path}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        f.write(render_metrics())
+    os.replace(temp_file, path)
+
+
+def _shutdown():
+    global _trace_file
+    write_metrics()
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.close()
+            _trace_file = None
+
+
+atexit.register(_shutdown)
+configure_from_env()
@@ -1,15 +1,23 @@
 import re
+import time
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright, BrowserContext
 
+from . import instrumentation as instr
+from .scraper_archive import http_session, new_browser_context
+from .scraping_profile import apply_profile_routes, context_options, launch_args, scraping_profile
+
 CARD_SELECTOR = ".c-siteReviewHeader_reviewScore"  # cards dos reviews
 SPAN_PATH = ":scope a div div span, :scope div a div div span"  # caminho pedido (com fallback)
 MAX_STEPS = 400  # limite de rolagens para evitar loop infinito
-PAUSE_MS = 350  # pausa entre rolagens (ms)
+GROWTH_TIMEOUT_MS = 2500  # espera máxima por novos cards após cada rolagem (ms)
+STALL_BUDGET_MS = 7500  # tempo total sem novos cards antes de desistir com resultado parcial (ms)
+MAX_TITLE_SECONDS = 90  # teto de tempo por filme no loop de rolagem
+TARGET_COUNT_PATTERN = re.compile(r"Showing\s+(\d+)\s+Critic Reviews", flags=re.I)
+IMDB_METACRITIC_LINK_CSS = 'div[data-testid="critic-reviews-title"] > div:nth-of-type(2) > div:nth-of-type(2) a[href]'
 
 
 def try_accept_cookies(page: BrowserContext):
@@ -41,7 +49,12 @@ def extract_target_count(page: BrowserContext) -> int:
 
     # Coleta todo innerText da página e usa regex
     body_text = page.evaluate("() => document.body.innerText")
-    m = re.search(r"Showing\s+(\d+)\s+Critic Reviews", body_text, flags=re.I)
+    return parse_target_count(body_text)
+
+
+def parse_target_count(text: str) -> int:
+    """Extrai N de 'Showing N Critic Reviews' (texto visível ou HTML salvo da página)."""
+    m = TARGET_COUNT_PATTERN.search(text)
     if not m:
         raise RuntimeError("Não encontrei o texto 'Showing N Critic Reviews' na página.")
     return int(m.group(1))
@@ -71,57 +84,126 @@ def collect_new_scores(page: BrowserContext, current_list: list, target_count: i
     return added
 
 
-def get_metacritic_critic_scores(page_url: str):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 " "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-            ),
-            locale="pt-BR",
-            extra_http_headers={"Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8"},
+def parse_critic_scores_html(html: str, target_count: int = None) -> list:
+    """
+    Versão estática de collect_new_scores: lê os cards de um HTML já renderizado
+    (ex.: página salva) com os mesmos seletores e devolve as notas na ordem da página.
+    """
+    soup = BeautifulSoup(html, "lxml")
+    if target_count is None:
+        target_count = parse_target_count(soup.get_text(" "))
+
+    scores = []
+    for card in soup.select(CARD_SELECTOR)[:target_count]:
+        span = card.select_one(SPAN_PATH)
+        txt = (span or card).get_text().strip()
+        scores.append(int(txt))
+    return scores
+
+
+def wait_for_card_growth(page: BrowserContext, previous_count: int, timeout_ms: int = GROWTH_TIMEOUT_MS) -> bool:
+    """
+    Espera (sem sleep fixo) até existirem mais de `previous_count` cards na página.
+    Retorna False se nada novo apareceu dentro de `timeout_ms`.
+    """
+    try:
+        page.wait_for_function(
+            "([selector, previous]) => document.querySelectorAll(selector).length > previous",
+            arg=[CARD_SELECTOR, previous_count],
+            timeout=timeout_ms,
         )
-        page = context.new_page()
-        page.goto(page_url, wait_until="domcontentloaded")
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def get_metacritic_critic_scores(page_url: str, with_status: bool = False):
+    """
+    Coleta as notas dos críticos de uma página de reviews do Metacritic.
+
+    Com with_status=True retorna (notas, status), onde status é "complete" ou o motivo
+    de um resultado parcial: "stalled" (sem novos cards por STALL_BUDGET_MS),
+    "time_budget" (MAX_TITLE_SECONDS) ou "max_steps".
+    """
+    profile = scraping_profile()
+    with sync_playwright() as p:
+        with instr.span("browser_launch", profile=profile["name"]):
+            browser = p.chromium.launch(headless=True, args=launch_args(profile))
+            # Em modo record/replay o contexto grava ou serve o HAR desta página
+            context = new_browser_context(
+                browser,
+                page_url,
+                user_agent=(
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 " "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+                ),
+                locale="pt-BR",
+                extra_http_headers={"Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8"},
+                **context_options(profile),
+            )
+            # Perfil "light" (SCRAPER_PROFILE): corta imagens, fontes e terceiros; "full" não bloqueia nada
+            apply_profile_routes(context, profile)
+            page = context.new_page()
+        with instr.span("metacritic_page_load", url=page_url):
+            page.goto(page_url, wait_until="domcontentloaded")
 
         try_accept_cookies(page)
 
         # 1) Descobrir N pela string "Showing N Critic Reviews"
-        target = extract_target_count(page)
+        with instr.span("target_count", url=page_url) as s:
+            target = extract_target_count(page)
+            s.set(target=target)
 
-        # 2) While loop: coletar até termos N valores
+        # 2) While loop: coletar até termos N valores ou o orçamento acabar
         scores = []
-        steps_no_growth = 0
+        status = "complete"
+        stalled_ms = 0
+        deadline = time.monotonic() + MAX_TITLE_SECONDS
 
         step = 0
-        while len(scores) < target and step < MAX_STEPS:
+        while len(scores) < target:
+            if step >= MAX_STEPS:
+                status = "max_steps"
+                break
+            if time.monotonic() > deadline:
+                status = "time_budget"
+                break
             step += 1
 
             # Coleta todos os cards visíveis e extrai os novos valores
-            added_now = collect_new_scores(page, scores, target)
+            with instr.span("extraction", url=page_url, step=step) as s:
+                added_now = collect_new_scores(page, scores, target)
+                s.set(added=added_now)
 
             if len(scores) >= target:
                 break
 
-            # Se não adicionou nada, tentamos rolar mais e ver se surgem novos cards
-            if added_now == 0:
-                steps_no_growth += 1
-            else:
-                steps_no_growth = 0
-
-            # Scroll 1 viewport para disparar carregamento de mais reviews
-            page.evaluate("window.scrollBy(0, document.documentElement.clientHeight)")
-            page.wait_for_timeout(PAUSE_MS)
+            # Pula direto para o fim da página (dispara o carregamento da próxima leva)
+            # e espera os cards novos aparecerem, em vez de dormir um tempo fixo
+            with instr.span("scroll_step", url=page_url, step=step) as s:
+                cards_before = page.locator(CARD_SELECTOR).count()
+                page.evaluate("window.scrollTo(0, document.documentElement.scrollHeight)")
+                grew = wait_for_card_growth(page, cards_before)
+                s.set(grew=grew)
 
-            # Se várias iterações sem crescer, tente estabilizar rede e continuar
-            if steps_no_growth >= 3:
-                try:
-                    page.wait_for_load_state("networkidle", timeout=3000)
-                except PlaywrightTimeoutError:
-                    pass
+            if grew:
+                stalled_ms = 0
+            else:
+                stalled_ms += GROWTH_TIMEOUT_MS
+                if stalled_ms >= STALL_BUDGET_MS:
+                    status = "stalled"
+                    break
+
+        # Última leitura: cards que chegaram durante a espera final
+        if len(scores) < target:
+            collect_new_scores(page, scores, target)
+            if len(scores) >= target:
+                status = "complete"
 
+        context.close()  # grava o HAR no modo record
         browser.close()
 
+        if with_status:
+            return scores, status
         return scores
 
 
@@ -129,22 +211,29 @@ def get_metacritic_page_from_imdb_db_id(db_id: str):
 
     imdb_page_url = f"https://www.imdb.com/title/{db_id}/criticreviews/"
 
-    resp = requests.get(
-        imdb_page_url,
-        headers={
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) " "AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/124.0.0.0 Safari/537.36"
+    with instr.span("imdb_fetch", imdb_id=db_id) as s:
+        with http_session() as session:
+            resp = session.get(
+                imdb_page_url,
+                headers={
+                    "User-Agent": (
+                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) " "AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/124.0.0.0 Safari/537.36"
+                    )
+                },
+                timeout=15,
             )
-        },
-        timeout=15,
-    )
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "lxml")
+        s.set(status=resp.status_code, bytes=len(resp.content))
+        resp.raise_for_status()
+    return parse_metacritic_link(resp.text, imdb_page_url, db_id)
+
+
+def parse_metacritic_link(html: str, imdb_page_url: str, db_id: str):
+    """Extrai do HTML da página de críticas do IMDb o nome do filme no Metacritic e a URL dos reviews."""
+    soup = BeautifulSoup(html, "lxml")
 
     # 1) Tentativa via seletor CSS (filhos diretos e 2º de cada nível):
     # div[data-testid="critic-reviews-title"] > div:nth-of-type(2) > div:nth-of-type(2) a[href]
-    css = 'div[data-testid="critic-reviews-title"] > div:nth-of-type(2) > div:nth-of-type(2) a[href]'
-    tag = soup.select_one(css)
+    tag = soup.select_one(IMDB_METACRITIC_LINK_CSS)
     if not tag:
         raise ValueError(f"Link do Metacritic não encontrado na página do IMDb para {db_id}")
 
@@ -155,7 +244,10 @@ def get_metacritic_page_from_imdb_db_id(db_id: str):
     return metacritic_movie_name, f"https://www.metacritic.com/movie/{metacritic_movie_name}/critic-reviews/"
 
 
-def get_metacritic_critic_scores_from_id(imdb_id: str):
+def get_metacritic_critic_scores_from_id(imdb_id: str, with_status: bool = False):
     metacritic_movie_name, metacritic_page_url = get_metacritic_page_from_imdb_db_id(imdb_id)
 
+    if with_status:
+        scores, status = get_metacritic_critic_scores(metacritic_page_url, with_status=True)
+        return metacritic_movie_name, scores, status
     return metacritic_movie_name, get_metacritic_critic_scores(metacritic_page_url)
@@ -3,7 +3,6 @@ from typing import Dict, Sequence, List, Tuple
 import math
 import numpy as np
 import pandas as pd
-from .metacritic_scraper import get_metacritic_critic_scores_from_id
 
 # ---------- utilidades robustas ----------
 
@@ -155,6 +154,61 @@ def features_from_scores_map(scores_by_film: Dict[str, Sequence[float]]) -> pd.D
     df = pd.DataFrame(rows).set_index("film").sort_values(["p_ge_90", "median", "n_reviews"], ascending=[False, False, False])
     return df
 
+# ---------- estatísticas no formato da tabela movie_rating_stats ----------
+
+# Colunas de features_from_scores_map -> colunas da tabela movie_rating_stats
+RATING_STATS_FEATURE_COLUMNS = {
+    "trimmed_mean_10": "trimmed_mean_10",
+    "trimmed_mean_20": "trimmed_mean_20",
+    "iqr": "iqr_score",
+    "mad": "mad_score",
+    "skewness": "skewness",
+    "excess_kurtosis": "excess_kurtosis",
+    "p_ge_90": "p_ge_90",
+    "p_ge_80": "p_ge_80",
+    "p_green_61_100": "p_green_61_100",
+    "p_yellow_40_60": "p_yellow_40_60",
+    "p_red_0_39": "p_red_0_39",
+    "entropy_gyr_bits": "entropy_gyr_bits",
+}
+
+RATING_STATS_COLUMNS = [
+    "movie_id", "n_samples", "mean_score", "median_score", "stddev_score", "p90_score",
+    "min_score", "max_score", *RATING_STATS_FEATURE_COLUMNS.values(),
+]
+
+def rating_stats_from_scores_map(scores_by_movie: Dict[str, Sequence[float]]) -> pd.DataFrame:
+    """
+    Estatísticas por filme com as colunas da tabela movie_rating_stats.
+    Mantém a semântica das colunas SQL originais (desvio-padrão populacional,
+    percentil 90 linear como percentile_cont) e acrescenta as features robustas
+    de features_from_scores_map. Filmes sem notas têm n_samples = 0 e NaN no resto.
+    Entrada: { 'tt0133093': [100, 91, ...], ... }
+    """
+    if not scores_by_movie:
+        return pd.DataFrame(columns=RATING_STATS_COLUMNS)
+
+    features = features_from_scores_map(scores_by_movie)
+
+    rows: List[Dict[str, float]] = []
+    for movie_id, scores in scores_by_movie.items():
+        arr = _clean_scores(scores)
+        n = int(arr.size)
+        rows.append({
+            "movie_id": movie_id,
+            "n_samples": n,
+            "mean_score": float(arr.mean()) if n else float("nan"),
+            "median_score": float(np.median(arr)) if n else float("nan"),
+            "stddev_score": float(arr.std(ddof=0)) if n else float("nan"),
+            "p90_score": float(np.percentile(arr, 90, method="linear")) if n else float("nan"),
+            "min_score": float(arr.min()) if n else float("nan"),
+            "max_score": float(arr.max()) if n else float("nan"),
+        })
+
+    df = pd.DataFrame(rows).set_index("movie_id")
+    df = df.join(features[list(RATING_STATS_FEATURE_COLUMNS)].rename(columns=RATING_STATS_FEATURE_COLUMNS))
+    return df.reset_index()[RATING_STATS_COLUMNS]
+
 # ---------- exemplo de uso ----------
 
 
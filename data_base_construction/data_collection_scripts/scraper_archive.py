@@ -0,0 +1,166 @@
+"""
+Scraper Archive - Gravação e reprodução (record/replay) das páginas do scraper
+
+Permite rodar o metacritic_scraper sem rede, a partir de páginas gravadas:
+- requests (página de críticas do IMDb): transport que grava/lê respostas em JSON
+- Playwright (reviews do Metacritic): HAR por página, gravado pelo próprio navegador
+  e servido com context.route_from_har (requisições não gravadas são abortadas)
+
+Modo escolhido pelas variáveis de ambiente:
+    SCRAPER_ARCHIVE_MODE   off (padrão) | record | replay
+    SCRAPER_ARCHIVE_DIR    diretório do arquivo (padrão: data/scraper_archive)
+
+Uso (a partir de data_base_construction/):
+    SCRAPER_ARCHIVE_MODE=record python -m db_populate_scipts.db_unifier   # grava páginas novas
+    SCRAPER_ARCHIVE_MODE=replay python -m benchmarks.scraper_replay       # reproduz offline
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+MODE_ENV = "SCRAPER_ARCHIVE_MODE"
+DIR_ENV = "SCRAPER_ARCHIVE_DIR"
+DEFAULT_ARCHIVE_DIR = "data/scraper_archive"
+MODES = ("off", "record", "replay")
+
+
+class ArchiveMissError(LookupError):
+    """Página pedida em modo replay que não está no arquivo."""
+
+
+def archive_mode() -> str:
+    mode = os.getenv(MODE_ENV, "off").strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"{MODE_ENV} inválido: {mode!r} (use {', '.join(MODES)})")
+    return mode
+
+
+def archive_dir() -> Path:
+    return Path(os.getenv(DIR_ENV, DEFAULT_ARCHIVE_DIR))
+
+
+def archive_key(url: str) -> str:
+    """Nome de arquivo estável para uma URL: trecho legível + hash curto."""
+    readable = re.sub(r"[^A-Za-z0-9]+", "_", url.split("://", 1)[-1]).strip("_")[:80]
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:10]
+    return f"{readable}_{digest}"
+
+# ============================================================================
+# REQUESTS (IMDb)
+# ============================================================================
+
+def _http_path(url: str) -> Path:
+    return archive_dir() / "http" / f"{archive_key(url)}.json"
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter normal que também grava cada resposta no arquivo."""
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        path = _http_path(request.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "url": request.url,
+            "method": request.method,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length")},
+            "encoding": response.encoding,
+            "body": response.content.decode(response.encoding or "utf-8", errors="replace"),
+        }
+        temp_file = f"{path}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(temp_file, path)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport offline: monta a Response a partir do arquivo, sem tocar na rede."""
+
+    def send(self, request, **kwargs):
+        path = _http_path(request.url)
+        if not path.exists():
+            raise ArchiveMissError(f"Sem gravação para {request.url} em {archive_dir()}")
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.reason = record["reason"]
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response.encoding = record["encoding"] or "utf-8"
+        response._content = record["body"].encode(response.encoding)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def http_session() -> requests.Session:
+    """Session com o transport do modo atual (off: rede normal)."""
+    session = requests.Session()
+    mode = archive_mode()
+    if mode == "record":
+        adapter = RecordingAdapter()
+    elif mode == "replay":
+        adapter = ReplayAdapter()
+    else:
+        return session
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# ============================================================================
+# PLAYWRIGHT (Metacritic)
+# ============================================================================
+
+def har_path(page_url: str) -> Path:
+    # .zip: conteúdo das respostas guardado comprimido ao lado do HAR
+    return archive_dir() / "har" / f"{archive_key(page_url)}.har.zip"
+
+
+def new_browser_context(browser, page_url: str, **context_kwargs):
+    """
+    browser.new_context(...) ligado ao arquivo da página:
+    record grava um HAR (escrito no context.close()), replay serve o HAR gravado.
+    """
+    mode = archive_mode()
+    if mode == "record":
+        path = har_path(page_url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return browser.new_context(record_har_path=str(path), record_har_content="attach", **context_kwargs)
+
+    context = browser.new_context(**context_kwargs)
+    if mode == "replay":
+        path = har_path(page_url)
+        if not path.exists():
+            context.close()
+            raise ArchiveMissError(f"Sem HAR gravado para {page_url} em {archive_dir()}")
+        context.route_from_har(str(path), not_found="abort")
+    return context
+
+
+def recorded_imdb_ids() -> list:
+    """IDs do IMDb com página de críticas gravada (ordem alfabética)."""
+    ids = set()
+    for path in (archive_dir() / "http").glob("*.json"):
+        with open(path, "r", encoding="utf-8") as f:
+            m = re.search(r"/title/(tt\d+)/criticreviews", json.load(f)["url"])
+        if m:
+            ids.add(m.group(1))
+    return sorted(ids)
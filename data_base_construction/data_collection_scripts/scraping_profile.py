@@ -0,0 +1,112 @@
+"""
+Scraping Profile - Perfil de navegação leve para o Playwright do metacritic_scraper
+
+O scraper só precisa do texto dos cards de review. O perfil "light" (opcional) corta
+o que não ajuda nisso:
+- tipos de recurso bloqueados (imagens, vídeo, fontes...)
+- requisições para domínios de terceiros (anúncios, analytics, players de vídeo)
+- imagens desligadas no próprio Chromium e viewport reduzido
+
+"full" (padrão) carrega a página inteira, como antes. "light" só deve virar o padrão
+depois que um replay sobre páginas gravadas mostrar as mesmas notas nos dois perfis
+(python -m benchmarks.scraper_replay --profiles full light). Configuração por
+variáveis de ambiente:
+    SCRAPER_PROFILE          full (padrão) | light
+    SCRAPER_BLOCK_TYPES      tipos de recurso bloqueados, separados por vírgula
+    SCRAPER_ALLOWED_DOMAINS  domínios permitidos (sufixos), separados por vírgula
+    SCRAPER_VIEWPORT         LARGURAxALTURA, ex.: 1024x768
+"""
+
+import os
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+PROFILE_ENV = "SCRAPER_PROFILE"
+
+PROFILES = {
+    "light": {
+        # stylesheet fica liberado: sem CSS a altura da página muda e o carregamento
+        # por rolagem deixa de disparar
+        "blocked_resource_types": ("image", "media", "font", "manifest", "texttrack"),
+        # metacritic.com (página e assets) + fandom.net (API que entrega os reviews)
+        "allowed_domains": ("metacritic.com", "fandom.net"),
+        "viewport": {"width": 1024, "height": 768},
+        "disable_images": True,
+    },
+    "full": {
+        "blocked_resource_types": (),
+        "allowed_domains": None,
+        "viewport": None,
+        "disable_images": False,
+    },
+}
+
+
+def _env_list(name: str) -> Optional[tuple]:
+    value = os.getenv(name)
+    if value is None:
+        return None
+    return tuple(v.strip().lower() for v in value.split(",") if v.strip())
+
+
+def scraping_profile() -> Dict:
+    """Perfil ativo (SCRAPER_PROFILE) com os ajustes finos das demais variáveis aplicados."""
+    name = os.getenv(PROFILE_ENV, "full").strip().lower()
+    if name not in PROFILES:
+        raise ValueError(f"{PROFILE_ENV} inválido: {name!r} (use {', '.join(PROFILES)})")
+    profile = dict(PROFILES[name], name=name)
+
+    blocked = _env_list("SCRAPER_BLOCK_TYPES")
+    if blocked is not None:
+        profile["blocked_resource_types"] = blocked
+    allowed = _env_list("SCRAPER_ALLOWED_DOMAINS")
+    if allowed is not None:
+        profile["allowed_domains"] = allowed or None
+    viewport = os.getenv("SCRAPER_VIEWPORT")
+    if viewport:
+        width, height = viewport.lower().split("x")
+        profile["viewport"] = {"width": int(width), "height": int(height)}
+    return profile
+
+# ============================================================================
+# PLAYWRIGHT
+# ============================================================================
+
+def launch_args(profile: Dict) -> list:
+    """Argumentos extras do chromium.launch para o perfil."""
+    return ["--blink-settings=imagesEnabled=false"] if profile["disable_images"] else []
+
+
+def context_options(profile: Dict) -> Dict:
+    """Opções extras do browser.new_context para o perfil."""
+    return {"viewport": profile["viewport"]} if profile["viewport"] else {}
+
+
+def is_allowed_host(host: str, allowed_domains) -> bool:
+    host = (host or "").lower()
+    return any(host == domain or host.endswith("." + domain) for domain in allowed_domains)
+
+
+def apply_profile_routes(context, profile: Dict):
+    """
+    Bloqueia recursos fora do perfil. Requisições liberadas seguem com route.fallback(),
+    então continuam passando pelo route_from_har do modo replay (scraper_archive.py).
+    """
+    blocked_types = set(profile["blocked_resource_types"])
+    allowed_domains = profile["allowed_domains"]
+    if not blocked_types and not allowed_domains:
+        return
+
+    def handle(route):
+        request = route.request
+        if request.resource_type in blocked_types:
+            return route.abort()
+        if allowed_domains and not is_allowed_host(urlparse(request.url).hostname, allowed_domains):
+            return route.abort()
+        return route.fallback()
+
+    context.route("**/*", handle)
@@ -17,6 +17,7 @@ from pandas import read_csv
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from tqdm import tqdm
 
+from data_collection_scripts import instrumentation as instr
 from data_collection_scripts.metacritic_scraper import get_metacritic_critic_scores_from_id
 
 # ============================================================================
@@ -32,6 +33,7 @@ RETRY_MAX_WAIT = 25  # Segundos máximos entre retries
 CSV_FILE = "data/raw/movies_catalog_oscar_and_popular_2000_2025.csv"
 OUTPUT_JSON = "data/processed/movie_scores.json"
 ERROR_JSON = "data/errors/error_list.json"
+PARTIAL_JSON = "data/errors/partial_list.json"  # filmes salvos com menos notas que o total da página
 ERROR_RETRY_JSON = "data/errors/error_list_from_error_list.json"
 ERROR_RETRY_OUTPUT = "data/processed/movie_scores_from_error_list.json"
 
@@ -80,9 +82,11 @@ def save_json(data: Dict, filepath: str):
     """Salva dados em JSON de forma segura."""
     temp_file = f"{filepath}.tmp"
     try:
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        os.replace(temp_file, filepath)  # Atomic replace
+        with instr.span("checkpoint_write", file=filepath, records=len(data)):
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, filepath)  # Atomic replace
+        instr.write_metrics()
     except Exception as e:
         logger.error(f"✗ Erro ao salvar {filepath}: {e}")
         if os.path.exists(temp_file):
@@ -101,6 +105,17 @@ def validate_csv(csv_path: str) -> Tuple[bool, str]:
     except Exception as e:
         return False, f"Erro ao ler CSV: {e}"
 
+def log_span_summary():
+    """Resume no log o tempo por etapa (só quando a instrumentação está ligada)."""
+    if not instr.is_enabled():
+        return
+    logger.info("Tempo por etapa (total | média | máx):")
+    for name, stats in instr.summary().items():
+        logger.info(
+            f"  {name:<22} {stats['total_s']:>10.1f}s | {stats['mean_ms']:>9.1f}ms | {stats['max_ms']:>9.1f}ms"
+            f"  ({stats['count']} spans, {stats['errors']} erros)"
+        )
+
 # ============================================================================
 # FUNÇÃO PRINCIPAL DE SCRAPING (com retry)
 # ============================================================================
@@ -111,17 +126,20 @@ def validate_csv(csv_path: str) -> Tuple[bool, str]:
     retry=retry_if_exception_type((ConnectionError, TimeoutError)),
     reraise=True
 )
-def fetch_one(imdb_id: str) -> Tuple[str, str, List[int]]:
+def fetch_one(imdb_id: str) -> Tuple[str, str, List[int], str]:
     """
     Busca scores do Metacritic para um filme.
     
     Inclui retry automático para erros de conexão/timeout.
     
     Returns:
-        (imdb_id, movie_name, scores_list)
+        (imdb_id, movie_name, scores_list, status) - status "complete" ou o motivo
+        do resultado parcial ("stalled", "time_budget", "max_steps")
     """
-    name, scores = get_metacritic_critic_scores_from_id(imdb_id)
-    return imdb_id, name, scores
+    with instr.span("title_fetch", imdb_id=imdb_id) as s:
+        name, scores, status = get_metacritic_critic_scores_from_id(imdb_id, with_status=True)
+        s.set(n_scores=len(scores), status=status)
+    return imdb_id, name, scores, status
 
 # ============================================================================
 # FUNÇÃO PRINCIPAL - PROCESSAR TODOS OS FILMES
@@ -152,6 +170,7 @@ def get_all_movies_scores():
     # 2. Carregar dados existentes (checkpoint)
     current_json = load_existing_json(OUTPUT_JSON)
     error_list = list(load_existing_json(ERROR_JSON).keys()) if os.path.exists(ERROR_JSON) else []
+    partial = load_existing_json(PARTIAL_JSON)
     
     # 3. Ler lista de IDs do CSV
     df = read_csv(CSV_FILE)
@@ -187,10 +206,15 @@ def get_all_movies_scores():
                 imdb_id = futures[future]
                 
                 try:
-                    imdb_id, name, scores = future.result()
+                    imdb_id, name, scores, status = future.result()
                     current_json[imdb_id] = scores
                     success_count += 1
                     save_counter += 1
+                    if status != "complete":
+                        logger.warning(f"⚠ Resultado parcial em {imdb_id} ({status}): {len(scores)} notas")
+                        partial[imdb_id] = {"status": status, "collected": len(scores)}
+                    else:
+                        partial.pop(imdb_id, None)
                     
                     pbar.set_postfix({
                         'sucesso': success_count,
@@ -227,6 +251,8 @@ def get_all_movies_scores():
     
     # 6. Salvar resultados finais
     save_json(current_json, OUTPUT_JSON)
+    if partial or os.path.exists(PARTIAL_JSON):
+        save_json(partial, PARTIAL_JSON)
     
     if error_list:
         error_dict = {imdb_id: None for imdb_id in error_list}
@@ -246,9 +272,12 @@ def get_all_movies_scores():
     logger.info(f"✗ Erros: {error_count}")
     logger.info(f"✓ Taxa de sucesso: {success_rate:.1f}%")
     logger.info(f"✓ Velocidade: {total_processed / elapsed.total_seconds():.2f} filmes/segundo")
+    log_span_summary()
     logger.info(f"✓ Resultados salvos em: {OUTPUT_JSON}")
     if error_list:
         logger.info(f"⚠ Lista de erros salva em: {ERROR_JSON}")
+    if partial:
+        logger.info(f"⚠ {len(partial)} filmes com resultado parcial em: {PARTIAL_JSON}")
 
 # ============================================================================
 # FUNÇÃO SECUNDÁRIA - REPROCESSAR ERROS
@@ -275,6 +304,7 @@ def get_movies_scores_that_return_an_error():
         error_ids = list(error_dict.keys())
     
     current_json = load_existing_json(ERROR_RETRY_OUTPUT)
+    partial = load_existing_json(PARTIAL_JSON)
     
     logger.info(f"✓ Total de erros a reprocessar: {len(error_ids)}")
     
@@ -304,10 +334,15 @@ def get_movies_scores_that_return_an_error():
                 imdb_id = futures[future]
                 
                 try:
-                    imdb_id, name, scores = future.result()
+                    imdb_id, name, scores, status = future.result()
                     current_json[imdb_id] = scores
                     success_count += 1
                     save_counter += 1
+                    if status != "complete":
+                        logger.warning(f"⚠ Resultado parcial em {imdb_id} ({status}): {len(scores)} notas")
+                        partial[imdb_id] = {"status": status, "collected": len(scores)}
+                    else:
+                        partial.pop(imdb_id, None)
                     
                     pbar.set_postfix({
                         'recuperados': success_count,
@@ -327,6 +362,8 @@ def get_movies_scores_that_return_an_error():
     
     # Salvar resultados
     save_json(current_json, ERROR_RETRY_OUTPUT)
+    if partial or os.path.exists(PARTIAL_JSON):
+        save_json(partial, PARTIAL_JSON)
     
     if remaining_errors:
         error_dict = {imdb_id: None for imdb_id in remaining_errors}
@@ -344,10 +381,105 @@ def get_movies_scores_that_return_an_error():
     logger.info(f"✓ Filmes recuperados: {success_count}")
     logger.info(f"✗ Ainda com erro: {error_count}")
     logger.info(f"✓ Taxa de recuperação: {recovery_rate:.1f}%")
+    log_span_summary()
     logger.info(f"✓ Resultados salvos em: {ERROR_RETRY_OUTPUT}")
     if remaining_errors:
         logger.info(f"⚠ Erros persistentes salvos em: {ERROR_RETRY_JSON}")
 
+# ============================================================================
+# FUNÇÃO SECUNDÁRIA - REPROCESSAR RESULTADOS PARCIAIS
+# ============================================================================
+
+def get_movies_scores_that_were_partial():
+    """
+    Recoleta os filmes salvos com resultado parcial (PARTIAL_JSON).
+    
+    As notas novas substituem as salvas (em OUTPUT_JSON ou ERROR_RETRY_OUTPUT)
+    só quando não são menos numerosas; filmes que chegam a "complete" saem de
+    PARTIAL_JSON, os demais ficam com o novo motivo para uma próxima rodada.
+    """
+    logger.info("=" * 60)
+    logger.info("REPROCESSANDO FILMES COM RESULTADO PARCIAL")
+    logger.info("=" * 60)
+    
+    partial = load_existing_json(PARTIAL_JSON)
+    if not partial:
+        logger.info("✓ Nenhum filme com resultado parcial!")
+        return
+    
+    outputs = {path: load_existing_json(path) for path in (OUTPUT_JSON, ERROR_RETRY_OUTPUT)}
+    ids_to_retry = list(partial.keys())
+    logger.info(f"✓ Total de parciais a reprocessar: {len(ids_to_retry)}")
+    
+    # Processar
+    start_time = datetime.now()
+    complete_count = 0
+    still_partial_count = 0
+    error_count = 0
+    touched = set()
+    save_counter = 0
+    
+    max_workers = min(MAX_WORKERS, len(ids_to_retry))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_one, imdb_id): imdb_id for imdb_id in ids_to_retry}
+        
+        with tqdm(total=len(ids_to_retry), desc="🔄 Reprocessando parciais", unit="filme") as pbar:
+            for future in as_completed(futures):
+                imdb_id = futures[future]
+                
+                try:
+                    imdb_id, name, scores, status = future.result()
+                    target = next((path for path, data in outputs.items() if imdb_id in data), OUTPUT_JSON)
+                    previous = outputs[target].get(imdb_id) or []
+                    if len(scores) >= len(previous):
+                        outputs[target][imdb_id] = scores
+                        touched.add(target)
+                    if status == "complete":
+                        partial.pop(imdb_id, None)
+                        complete_count += 1
+                    else:
+                        partial[imdb_id] = {"status": status, "collected": max(len(scores), len(previous))}
+                        still_partial_count += 1
+                    save_counter += 1
+                    
+                    pbar.set_postfix({
+                        'completos': complete_count,
+                        'ainda parciais': still_partial_count,
+                        'erros': error_count
+                    })
+                    
+                    if save_counter >= SAVE_INTERVAL:
+                        for path in touched:
+                            save_json(outputs[path], path)
+                        save_json(partial, PARTIAL_JSON)
+                        save_counter = 0
+                    
+                except Exception as e:
+                    logger.error(f"✗ Erro em {imdb_id} (mantido em {PARTIAL_JSON}): {e}")
+                    error_count += 1
+                
+                pbar.update(1)
+    
+    # Salvar resultados
+    for path in touched:
+        save_json(outputs[path], path)
+    save_json(partial, PARTIAL_JSON)
+    
+    # Estatísticas
+    elapsed = datetime.now() - start_time
+    
+    logger.info("=" * 60)
+    logger.info("REPROCESSAMENTO CONCLUÍDO")
+    logger.info("=" * 60)
+    logger.info(f"✓ Tempo total: {elapsed}")
+    logger.info(f"✓ Filmes completos: {complete_count}")
+    logger.info(f"⚠ Ainda parciais: {still_partial_count}")
+    logger.info(f"✗ Erros: {error_count}")
+    log_span_summary()
+    if partial:
+        logger.info(f"⚠ {len(partial)} filmes ainda com resultado parcial em: {PARTIAL_JSON}")
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -357,5 +489,7 @@ if __name__ == "__main__":
     
     if len(sys.argv) > 1 and sys.argv[1] == "--retry-errors":
         get_movies_scores_that_return_an_error()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--retry-partial":
+        get_movies_scores_that_were_partial()
     else:
         get_all_movies_scores()
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Feature Builder - ml_training_dataset sem banco de dados
+
+Calcula as mesmas colunas da view ml_training_dataset (schema.sql) direto do CSV do
+catálogo e do JSON de notas, com operações vetorizadas do pandas:
+- parsing igual ao populate_db.py (lista de erros, "Sim"/"Não", valores monetários,
+  listas separadas por vírgula, pessoas identificadas pelo nome)
+- z-scores e box_office_rank_in_year por ano (mesma semântica de STDDEV e RANK)
+- contagens de gêneros/países/idiomas/pessoas e flags de gênero
+- pedigree: filmes indicados distintos, em anos anteriores, dos diretores/atores
+  (mesmo cálculo de person_nomination_history + ml_training_dataset)
+- estatísticas das notas com scores_processor.rating_stats_from_scores_map
+
+Uso (a partir de data_base_construction/):
+    python -m db_populate_scipts.feature_builder --output data/processed/ml_training_dataset.parquet
+    python -m db_populate_scipts.feature_builder --validate   # compara coluna a coluna com ml_training_dataset_mat
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_collection_scripts.scores_processor import RATING_STATS_COLUMNS, rating_stats_from_scores_map
+
+# ============================================================================
+# CONFIGURAÇÕES
+# ============================================================================
+
+# Mesmos arquivos padrão do populate_db.py (relativos a data_base_construction/)
+CSV_FILE = "data/raw/movies_catalog_oscar_and_popular_2000_2025.csv"
+SCORES_JSON = "data/processed/movie_scores.json"
+ERROR_JSON = "data/errors/error_list_from_error_list.json"
+
+# Colunas na ordem da view ml_training_dataset
+DATASET_COLUMNS = [
+    "imdb_id", "original_title", "release_year", "imdb_rating", "imdb_votes", "runtime_minutes", "metascore",
+    "box_office_rank_in_year", "votes_normalized_by_year", "rating_normalized_by_year",
+    *RATING_STATS_COLUMNS[1:],
+    "num_genres", "num_countries", "num_languages", "num_directors", "num_writers", "num_cast",
+    "director_prev_nominations", "cast_prev_nominations",
+    "is_drama", "is_biography", "is_history",
+    "label",
+]
+
+# Coluna do CSV -> tabela de associação
+LINK_COLUMNS = {"genres": "Gêneros", "countries": "Países", "languages": "Idiomas"}
+PEOPLE_COLUMNS = {"director": "Diretores", "writer": "Roteiristas", "cast": "Elenco Principal"}
+GENRE_FLAGS = {"is_drama": "Drama", "is_biography": "Biography", "is_history": "History"}
+
+# Tolerância da validação (z-scores vêm de NUMERIC no Postgres)
+VALIDATION_RTOL = 1e-9
+VALIDATION_ATOL = 1e-9
+
+# ============================================================================
+# PARSING (mesmas regras do populate_db.py)
+# ============================================================================
+
+def parse_money_column(values: pd.Series) -> pd.Series:
+    """Versão vetorizada de populate_db.parse_money: 'USD 1,234' -> 1234.0; inválido -> NaN."""
+    clean = values.astype("string").str.replace(r"[^0-9.]", "", regex=True)
+    return pd.to_numeric(clean, errors="coerce").astype(float)
+
+
+def split_list_column(movies: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    Pares (imdb_id, nome) de uma coluna "a, b, c" sem repetição, como as tabelas de
+    associação após o ON CONFLICT DO NOTHING. Valores ausentes viram o texto "nan",
+    igual ao str(row[...]) do populate_db.
+    """
+    names = movies[column].astype(object).map(str).str.split(",")
+    pairs = pd.DataFrame({"imdb_id": movies["imdb_id"].repeat(names.str.len()).to_numpy(),
+                          "name": np.concatenate(names.to_numpy()) if len(names) else []})
+    pairs["name"] = pairs["name"].str.strip()
+    return pairs[pairs["name"] != ""].drop_duplicates(ignore_index=True)
+
+
+def load_catalog(csv_path: str = CSV_FILE, errors_path: Optional[str] = ERROR_JSON) -> pd.DataFrame:
+    """Filmes do CSV no formato da tabela movies (sem os IDs da lista de erros)."""
+    df = pd.read_csv(csv_path)
+    if errors_path and os.path.exists(errors_path):
+        with open(errors_path, "r", encoding="utf-8") as f:
+            df = df[~df["ID IMDb"].isin(json.load(f).keys())]
+    # ON CONFLICT (imdb_id) DO NOTHING: a primeira ocorrência vence
+    df = df.drop_duplicates("ID IMDb", keep="first")
+
+    movies = pd.DataFrame({
+        "imdb_id": df["ID IMDb"],
+        "original_title": df["Título Original"],
+        "release_year": df["Ano Lançamento"].astype(int),
+        "imdb_rating": df["Nota IMDb"].astype(float).round(1),  # DECIMAL(3,1)
+        "imdb_votes": df["Votos"].astype("Int64"),
+        "runtime_minutes": df["Duração (min)"].astype("Int64"),
+        "metascore": df["Metascore"].astype("Int64"),
+        "nominated_oscar": df["Indicado Oscar"].astype(str).str.strip().str.lower() == "sim",
+        "worldwide_gross": parse_money_column(df["Bilheteria Mundial"]),
+    })
+    for column in [*LINK_COLUMNS.values(), *PEOPLE_COLUMNS.values()]:
+        movies[column] = df[column]
+    return movies.reset_index(drop=True)
+
+
+def load_scores(scores_path: str = SCORES_JSON) -> Dict[str, list]:
+    with open(scores_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# ============================================================================
+# FEATURES
+# ============================================================================
+
+def year_zscore(values: pd.Series, years: pd.Series) -> pd.Series:
+    """(x - média do ano) / desvio-padrão amostral do ano; NULL quando o desvio é 0 ou indefinido."""
+    grouped = values.astype(float).groupby(years)
+    std = grouped.transform("std")
+    return ((values.astype(float) - grouped.transform("mean")) / std).where(std > 0)
+
+
+def box_office_rank(gross: pd.Series, years: pd.Series) -> pd.Series:
+    """RANK() OVER (PARTITION BY ano ORDER BY bilheteria DESC NULLS LAST)."""
+    # Sem bilheteria: empatados logo após o último filme com valor
+    filled = gross.fillna(-np.inf)
+    return filled.groupby(years).rank(method="min", ascending=False).astype(int)
+
+
+def category_features(movies: pd.DataFrame) -> pd.DataFrame:
+    """num_genres/num_countries/num_languages e as flags de gênero, por imdb_id."""
+    features = pd.DataFrame(index=movies["imdb_id"])
+    for table, column in LINK_COLUMNS.items():
+        pairs = split_list_column(movies, column)
+        features[f"num_{table}"] = pairs.groupby("imdb_id").size()
+        if table == "genres":
+            for flag, genre in GENRE_FLAGS.items():
+                features[flag] = pairs[pairs["name"] == genre].groupby("imdb_id").size().gt(0).astype(int)
+    return features
+
+
+def people_features(movies: pd.DataFrame) -> pd.DataFrame:
+    """
+    Contagens por papel e pedigree (director/cast_prev_nominations).
+
+    Para cada filme: quantos filmes indicados distintos, lançados em anos anteriores,
+    têm algum dos seus diretores (ou atores) com crédito em qualquer papel.
+    """
+    credits = pd.concat(
+        [split_list_column(movies, column).assign(role=role) for role, column in PEOPLE_COLUMNS.items()],
+        ignore_index=True,
+    )
+    credits = credits.merge(movies[["imdb_id", "release_year", "nominated_oscar"]], on="imdb_id")
+
+    # person_nomination_history: (pessoa, filme indicado, ano)
+    history = (credits.loc[credits["nominated_oscar"], ["name", "imdb_id", "release_year"]]
+               .drop_duplicates(["name", "imdb_id"])
+               .rename(columns={"imdb_id": "prev_imdb_id", "release_year": "prev_year"}))
+    pedigree_credits = credits[credits["role"].isin(["director", "cast"])].merge(history, on="name")
+    pedigree_credits = pedigree_credits[pedigree_credits["prev_year"] < pedigree_credits["release_year"]]
+
+    counts = credits.groupby(["imdb_id", "role"]).size().unstack(fill_value=0)
+    pedigree = pedigree_credits.groupby(["imdb_id", "role"])["prev_imdb_id"].nunique().unstack()
+
+    features = pd.DataFrame(index=movies["imdb_id"])
+    for role in PEOPLE_COLUMNS:
+        features[f"num_{role}s" if role != "cast" else "num_cast"] = counts.get(role)
+    features["director_prev_nominations"] = pedigree.get("director")
+    features["cast_prev_nominations"] = pedigree.get("cast")
+    return features
+
+
+def rating_features(movies: pd.DataFrame, scores: Dict[str, list]) -> pd.DataFrame:
+    """Colunas de movie_rating_stats (notas como SMALLINT, igual a movie_rating_samples)."""
+    scores_by_movie = {
+        imdb_id: [int(score) for score in scores.get(imdb_id) or []]
+        for imdb_id in movies["imdb_id"]
+    }
+    return rating_stats_from_scores_map(scores_by_movie).set_index("movie_id")
+
+
+def build_training_dataset(movies: pd.DataFrame, scores: Dict[str, list]) -> pd.DataFrame:
+    """
+    Monta o equivalente de ml_training_dataset (mesmas colunas, ordem e COALESCEs).
+
+    Args:
+        movies: Saída de load_catalog
+        scores: {imdb_id: [notas]} do JSON do Metacritic
+
+    Returns:
+        DataFrame ordenado por (release_year, imdb_id)
+    """
+    df = movies[["imdb_id", "original_title", "release_year", "imdb_rating",
+                 "imdb_votes", "runtime_minutes", "metascore"]].copy()
+    df["box_office_rank_in_year"] = box_office_rank(movies["worldwide_gross"], movies["release_year"])
+    df["votes_normalized_by_year"] = year_zscore(movies["imdb_votes"], movies["release_year"])
+    df["rating_normalized_by_year"] = year_zscore(movies["imdb_rating"], movies["release_year"])
+
+    df = df.set_index("imdb_id")
+    df = df.join(rating_features(movies, scores)[RATING_STATS_COLUMNS[1:]].fillna(0))
+    df = df.join(category_features(movies)).join(people_features(movies))
+
+    count_columns = [c for c in DATASET_COLUMNS if c.startswith(("num_", "is_")) or c.endswith("_prev_nominations")]
+    df[count_columns] = df[count_columns].fillna(0).astype(int)
+    df["n_samples"] = df["n_samples"].astype(int)
+    df["label"] = movies.set_index("imdb_id")["nominated_oscar"].astype(int)
+
+    return df.reset_index()[DATASET_COLUMNS].sort_values(["release_year", "imdb_id"], ignore_index=True)
+
+# ============================================================================
+# VALIDAÇÃO
+# ============================================================================
+
+def compare_with_view(built: pd.DataFrame, reference: pd.DataFrame) -> Dict[str, int]:
+    """Número de valores divergentes por coluna (0 = idêntica ao banco)."""
+    built = built.set_index("imdb_id").sort_index()
+    reference = reference.set_index("imdb_id").sort_index()
+    mismatches = {"__missing_rows__": len(reference.index.difference(built.index)),
+                  "__extra_rows__": len(built.index.difference(reference.index))}
+    common = built.index.intersection(reference.index)
+    for column in DATASET_COLUMNS[1:]:
+        a, b = built.loc[common, column], reference.loc[common, column]
+        if pd.api.types.is_numeric_dtype(b) or pd.api.types.is_numeric_dtype(a):
+            a, b = a.astype(float).to_numpy(), b.astype(float).to_numpy()
+            same = np.isclose(a, b, rtol=VALIDATION_RTOL, atol=VALIDATION_ATOL, equal_nan=True)
+        else:
+            same = (a == b).to_numpy()
+        mismatches[column] = int((~same).sum())
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monta ml_training_dataset a partir do CSV e do JSON de notas, sem banco.")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV do catálogo (colunas em português)")
+    parser.add_argument("--scores", default=SCORES_JSON, help="JSON {imdb_id: [notas]}")
+    parser.add_argument("--errors", default=ERROR_JSON, help="JSON com IDs a ignorar (opcional)")
+    parser.add_argument("--output", type=Path, default=None, help="Arquivo de saída (.csv ou .parquet)")
+    parser.add_argument("--validate", action="store_true", help="Compara com ml_training_dataset_mat no Postgres")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    movies = load_catalog(args.csv, args.errors)
+    dataset = build_training_dataset(movies, load_scores(args.scores))
+    print(f"✅ {len(dataset)} filmes × {len(dataset.columns)} colunas em {time.perf_counter() - start:.2f}s")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        if args.output.suffix == ".parquet":
+            dataset.to_parquet(args.output, index=False)
+        else:
+            dataset.to_csv(args.output, index=False)
+        print(f"💾 Dataset salvo em {args.output}")
+
+    if args.validate:
+        from db_populate_scipts.data_loader import run_custom_query
+
+        reference = run_custom_query("SELECT * FROM ml_training_dataset_mat")
+        mismatches = compare_with_view(dataset, reference)
+        diverging = {column: n for column, n in mismatches.items() if n}
+        if diverging:
+            print(f"❌ Divergências em relação ao banco: {diverging}")
+        else:
+            print(f"✅ Idêntico a ml_training_dataset_mat ({len(reference)} linhas, {len(DATASET_COLUMNS)} colunas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
+import argparse
+import os
 import pandas as pd
 import json
+import math
 import re
+import time
 import psycopg2
 from psycopg2 import extras
 from decimal import Decimal
+from dotenv import load_dotenv
+
+from data_collection_scripts import instrumentation as instr
+from data_collection_scripts.scores_processor import RATING_STATS_COLUMNS, rating_stats_from_scores_map
 
 # Função utilitária para converter strings monetárias em Decimal(18,2)
 def parse_money(value: str) -> Decimal | None:
@@ -16,26 +24,46 @@ def parse_money(value: str) -> Decimal | None:
     except:
         return None
 
-# Conexão com o banco (ajustar host, dbname, usuário e senha conforme o ambiente)
+# Arquivos de entrada padrão (relativos a data_base_construction/)
+CSV_FILE = "data/raw/movies_catalog_oscar_and_popular_2000_2025.csv"
+SCORES_JSON = "data/processed/movie_scores.json"
+ERROR_JSON = "data/errors/error_list_from_error_list.json"
+
+parser = argparse.ArgumentParser(description="Carrega o catálogo de filmes e as notas do Metacritic no PostgreSQL.")
+parser.add_argument("--csv", default=CSV_FILE, help="CSV do catálogo (colunas em português)")
+parser.add_argument("--scores", default=SCORES_JSON, help="JSON {imdb_id: [notas]}")
+parser.add_argument("--errors", default=ERROR_JSON, help="JSON com IDs a ignorar (opcional)")
+parser.add_argument("--trace", default=None, help="Grava spans de tempo em JSONL (ou PIPELINE_TRACE_FILE)")
+parser.add_argument("--metrics", default=None, help="Grava métricas no formato Prometheus (ou PIPELINE_METRICS_FILE)")
+args = parser.parse_args()
+instr.configure(args.trace, args.metrics)
+
+# Conexão com o banco (mesmas variáveis do .env usadas por data_loader.py)
+load_dotenv()
 conn = psycopg2.connect(
-    host="localhost",
-    dbname="moviesdb",
-    user="postgres",
-    password="postgres",
+    host=os.getenv("DB_HOST", "localhost"),
+    port=os.getenv("DB_PORT", "5432"),
+    dbname=os.getenv("DB_NAME", "moviesdb"),
+    user=os.getenv("DB_USER", "postgres"),
+    password=os.getenv("DB_PASSWORD", "postgres"),
 )
 
 # Carregar CSV com pandas
-df = pd.read_csv("data/raw/movies_catalog_oscar_and_popular_2000_2025.csv")
+with instr.span("csv_read", file=args.csv) as s:
+    df = pd.read_csv(args.csv)
+    s.set(rows=len(df))
 
 # Carregar JSON das amostras de nota
-with open("data/processed/movie_scores.json", "r", encoding="utf-8") as f:
+with instr.span("scores_read", file=args.scores), open(args.scores, "r", encoding="utf-8") as f:
     rating_data = json.load(f)
 
 # Carregar lista de IDs com erro que devem ser ignorados
-with open("data/errors/error_list_from_error_list.json", "r", encoding="utf-8") as f:
-    error_list = json.load(f)
-    # Criar um set para lookup O(1)
-    error_imdb_ids = set(error_list.keys())
+error_imdb_ids = set()
+if os.path.exists(args.errors):
+    with open(args.errors, "r", encoding="utf-8") as f:
+        error_list = json.load(f)
+        # Criar um set para lookup O(1)
+        error_imdb_ids = set(error_list.keys())
 
 # Criar cursores
 cur = conn.cursor()
@@ -73,6 +101,7 @@ country_rows = []
 language_rows = []
 people_rows = []
 
+parse_start = time.perf_counter()
 for idx, row in df.iterrows():
     imdb_id = row["ID IMDb"]
     
@@ -143,54 +172,150 @@ for idx, row in df.iterrows():
     for order, actor in enumerate(cast_list, start=1):
         pid = get_or_create(actor, "people", people_lookup)
         people_rows.append((imdb_id, pid, 'cast', order))
+instr.record("row_parse", time.perf_counter() - parse_start, rows=len(df))
 
 # Inserir dados em lote usando execute_values para melhor performance:contentReference[oaicite:2]{index=2}.
+# Filmes alterados nesta carga (RETURNING só devolve as linhas realmente gravadas):
+# definem a partir de que ano ml_training_dataset_mat precisa ser recalculada
+touched_keys = set()
+
 # Inserir filmes
-extras.execute_values(cur,
-    "INSERT INTO movies (imdb_id, original_title, br_title, release_year, imdb_rating, imdb_votes, runtime_minutes, "
-    "nominated_oscar, won_oscar, oscar_ceremony_year, oscar_status, metascore, synopsis) "
-    "VALUES %s ON CONFLICT (imdb_id) DO NOTHING",
-    movie_rows
-)
+with instr.span("db_insert.movies", rows=len(movie_rows)):
+    touched_keys.update(row[0] for row in extras.execute_values(cur,
+        "INSERT INTO movies (imdb_id, original_title, br_title, release_year, imdb_rating, imdb_votes, runtime_minutes, "
+        "nominated_oscar, won_oscar, oscar_ceremony_year, oscar_status, metascore, synopsis) "
+        "VALUES %s ON CONFLICT (imdb_id) DO NOTHING RETURNING movie_key",
+        movie_rows,
+        fetch=True
+    ))
 
 # Inserir box office
-extras.execute_values(cur,
-    "INSERT INTO movie_box_office (movie_id, budget, worldwide_gross, domestic_gross) VALUES %s "
-    "ON CONFLICT (movie_id) DO NOTHING",
-    box_rows
-)
+with instr.span("db_insert.movie_box_office", rows=len(box_rows)):
+    box_ids = extras.execute_values(cur,
+        "INSERT INTO movie_box_office (movie_id, budget, worldwide_gross, domestic_gross) VALUES %s "
+        "ON CONFLICT (movie_id) DO NOTHING RETURNING movie_id",
+        box_rows,
+        fetch=True
+    )
 
-# Inserir relações N:N
-extras.execute_values(cur,
-    "INSERT INTO movie_genres (movie_id, genre_id) VALUES %s ON CONFLICT DO NOTHING",
-    genre_rows
-)
-extras.execute_values(cur,
-    "INSERT INTO movie_countries (movie_id, country_id) VALUES %s ON CONFLICT DO NOTHING",
-    country_rows
+# Resolver as chaves inteiras (movie_key) de todos os filmes em uma única consulta
+cur.execute(
+    "SELECT imdb_id, movie_key FROM movies WHERE imdb_id = ANY(%s)",
+    (list({row[0] for row in movie_rows} | set(rating_data.keys())),)
 )
-extras.execute_values(cur,
-    "INSERT INTO movie_languages (movie_id, language_id) VALUES %s ON CONFLICT DO NOTHING",
-    language_rows
-)
-extras.execute_values(cur,
-    "INSERT INTO movie_people (movie_id, person_id, role, cast_order) VALUES %s ON CONFLICT DO NOTHING",
-    people_rows
+movie_keys = dict(cur.fetchall())
+touched_keys.update(movie_keys[row[0]] for row in box_ids)
+
+# Inserir relações N:N (chaveadas por movie_key)
+with instr.span("db_insert.movie_genres", rows=len(genre_rows)):
+    touched_keys.update(row[0] for row in extras.execute_values(cur,
+        "INSERT INTO movie_genres (movie_key, genre_id) VALUES %s ON CONFLICT DO NOTHING RETURNING movie_key",
+        [(movie_keys[imdb_id], gid) for imdb_id, gid in genre_rows],
+        fetch=True
+    ))
+with instr.span("db_insert.movie_countries", rows=len(country_rows)):
+    touched_keys.update(row[0] for row in extras.execute_values(cur,
+        "INSERT INTO movie_countries (movie_key, country_id) VALUES %s ON CONFLICT DO NOTHING RETURNING movie_key",
+        [(movie_keys[imdb_id], cid) for imdb_id, cid in country_rows],
+        fetch=True
+    ))
+with instr.span("db_insert.movie_languages", rows=len(language_rows)):
+    touched_keys.update(row[0] for row in extras.execute_values(cur,
+        "INSERT INTO movie_languages (movie_key, language_id) VALUES %s ON CONFLICT DO NOTHING RETURNING movie_key",
+        [(movie_keys[imdb_id], lid) for imdb_id, lid in language_rows],
+        fetch=True
+    ))
+with instr.span("db_insert.movie_people", rows=len(people_rows)):
+    touched_keys.update(row[0] for row in extras.execute_values(cur,
+        "INSERT INTO movie_people (movie_key, person_id, role, cast_order) VALUES %s ON CONFLICT DO NOTHING RETURNING movie_key",
+        [(movie_keys[imdb_id], pid, role, order) for imdb_id, pid, role, order in people_rows],
+        fetch=True
+    ))
+
+# Inserir amostras de notas do JSON (um array por filme)
+rating_rows = [
+    (movie_keys[imdb_id], [int(score) for score in samples])
+    for imdb_id, samples in rating_data.items()
+    if samples
+]
+
+# Amostras existentes nunca são sobrescritas: só acrescentamos as posições novas.
+# RETURNING devolve apenas os filmes cujas notas mudaram.
+with instr.span("db_insert.movie_rating_samples", rows=len(rating_rows)):
+    inserted_samples = extras.execute_values(cur,
+        "INSERT INTO movie_rating_samples AS s (movie_key, scores) VALUES %s "
+        "ON CONFLICT (movie_key) DO UPDATE "
+        "SET scores = s.scores || EXCLUDED.scores[cardinality(s.scores) + 1:] "
+        "WHERE cardinality(EXCLUDED.scores) > cardinality(s.scores) "
+        "RETURNING movie_key",
+        rating_rows,
+        template="(%s, %s::SMALLINT[])",
+        fetch=True
+    )
+
+# Atualizar movie_rating_stats de forma incremental:
+# filmes com amostras novas + filmes que ainda não têm linha de estatísticas
+imdb_ids_by_key = {key: imdb_id for imdb_id, key in movie_keys.items()}
+touched_keys.update(row[0] for row in inserted_samples)
+stats_ids = {imdb_ids_by_key[row[0]] for row in inserted_samples}
+cur.execute(
+    "SELECT m.imdb_id FROM movies m "
+    "WHERE NOT EXISTS (SELECT 1 FROM movie_rating_stats s WHERE s.movie_id = m.imdb_id)"
 )
+stats_ids.update(row[0] for row in cur.fetchall())
+
+if stats_ids:
+    # Fonte da verdade são as amostras gravadas no banco, não o JSON
+    cur.execute(
+        "SELECT m.imdb_id, s.scores FROM movie_rating_samples s "
+        "JOIN movies m ON s.movie_key = m.movie_key WHERE m.imdb_id = ANY(%s)",
+        (list(stats_ids),)
+    )
+    scores_by_movie = {imdb_id: [] for imdb_id in stats_ids}
+    scores_by_movie.update(dict(cur.fetchall()))
 
-# Inserir amostras de notas do JSON
-rating_rows = []
-for imdb_id, samples in rating_data.items():
-    for idx, score in enumerate(samples, start=1):
-        rating_rows.append((imdb_id, int(score), idx))
+    with instr.span("rating_stats", movies=len(scores_by_movie)):
+        stats_df = rating_stats_from_scores_map(scores_by_movie)
+    # NaN -> NULL (psycopg2 gravaria 'NaN'::float)
+    stats_rows = [
+        tuple(None if isinstance(v, float) and math.isnan(v) else v for v in row)
+        for row in stats_df.itertuples(index=False, name=None)
+    ]
+    stats_columns = ", ".join(RATING_STATS_COLUMNS)
+    stats_updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in RATING_STATS_COLUMNS[1:])
+    with instr.span("db_insert.movie_rating_stats", rows=len(stats_rows)):
+        extras.execute_values(cur,
+            f"INSERT INTO movie_rating_stats ({stats_columns}) VALUES %s "
+            f"ON CONFLICT (movie_id) DO UPDATE SET {stats_updates}",
+            stats_rows
+        )
+    print(f"movie_rating_stats atualizado para {len(stats_rows)} filmes")
 
-extras.execute_values(cur,
-    "INSERT INTO rating_samples (movie_id, score_value, sample_index) VALUES %s "
-    "ON CONFLICT (movie_id, sample_index) DO NOTHING",
-    rating_rows
+with instr.span("db_commit"):
+    conn.commit()
+
+# Atualizar o dataset de ML materializado a partir do menor ano entre os filmes alterados
+# (novos, com relações/notas novas ou com estatísticas recalculadas); anos anteriores
+# não são afetados. Sem alterações, a tabela materializada já está atual.
+cur.execute(
+    "SELECT MIN(release_year) FROM movies WHERE movie_key = ANY(%s) OR imdb_id = ANY(%s)",
+    (list(touched_keys), list(stats_ids))
 )
+from_year = cur.fetchone()[0]
+if from_year is None:
+    print("ml_training_dataset_mat já atualizado (nenhum filme alterado)")
+else:
+    with instr.span("refresh_ml_training_dataset", from_year=from_year):
+        cur.execute("SELECT refresh_ml_training_dataset(%s)", (from_year,))
+        refreshed = cur.fetchone()[0]
+        conn.commit()
+    print(f"ml_training_dataset_mat atualizado a partir de {from_year} ({refreshed} linhas)")
 
-conn.commit()
 cur.close()
 conn.close()
+
+if instr.is_enabled():
+    print("Tempo por etapa:")
+    for name, stats in instr.summary().items():
+        print(f"  {name:<32} {stats['total_s']:>8.3f}s  ({stats['count']}×)")
 print("ETL concluído com sucesso!")
@@ -0,0 +1,415 @@
+-- ==============================================================================
+-- MIGRAÇÃO: schema original -> schema atual
+-- ==============================================================================
+-- Para bancos criados com a versão original do schema.sql (tabelas de associação
+-- chaveadas por movie_id VARCHAR, rating_samples com uma linha por nota e
+-- movie_rating_stats / ml_training_dataset como views).
+--
+-- Uso (a partir da raiz do repositório):
+--   psql -h localhost -U postgres -d moviesdb -f data_base_construction/migrations/001_baseline_to_movie_key_and_arrays.sql
+--   cd data_base_construction && python -m db_populate_scipts.populate_db
+--
+-- Roda em uma única transação; em caso de erro nada é alterado. O populate_db em
+-- seguida não duplica dados (ON CONFLICT) e preenche o que esta migração deixa vazio:
+-- movie_rating_stats (calculada em Python por scores_processor) e
+-- ml_training_dataset_mat.
+--
+-- Passos:
+--   1. remove as views do schema original (recriadas no passo 5 com as definições atuais);
+--      views próprias que dependam delas fazem a migração falhar sem alterar nada
+--   2. adiciona movies.movie_key e troca movie_id por movie_key nas tabelas de associação
+--   3. converte rating_samples em movie_rating_samples (um array por filme, na ordem de
+--      sample_index) + visão compatível rating_samples
+--   4. recria os índices auxiliares para os novos padrões de acesso
+--   5. cria movie_rating_stats (tabela), person_nomination_history, ml_training_dataset,
+--      ml_training_dataset_mat e as views ml_split_* exatamente como no schema.sql atual
+--
+-- Diferença em relação a um banco criado do zero: movie_key fica na última posição
+-- de movies e das tabelas de associação (nenhuma consulta depende da ordem das colunas).
+
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- ------------------------------------------------------------------------------
+-- 1. Views do schema original
+-- ------------------------------------------------------------------------------
+DROP VIEW IF EXISTS ml_split_train, ml_split_validation, ml_split_test, ml_split_prediction_2025;
+DROP VIEW IF EXISTS ml_training_dataset;
+DROP VIEW IF EXISTS movie_rating_stats;
+
+-- ------------------------------------------------------------------------------
+-- 2. Chave substituta inteira (movie_key)
+-- ------------------------------------------------------------------------------
+-- SERIAL numera as linhas existentes ao adicionar a coluna
+ALTER TABLE movies ADD COLUMN movie_key SERIAL NOT NULL UNIQUE;
+
+COMMENT ON COLUMN movies.movie_key IS 'Chave substituta inteira usada pelas tabelas de associação (joins por INT em vez de texto).';
+
+-- Para cada tabela de associação: preenche movie_key a partir de movie_id e remove
+-- movie_id (o que também remove a PK, a FK e os índices antigos que usavam a coluna)
+ALTER TABLE movie_genres ADD COLUMN movie_key INT;
+UPDATE movie_genres t SET movie_key = m.movie_key FROM movies m WHERE m.imdb_id = t.movie_id;
+ALTER TABLE movie_genres DROP COLUMN movie_id;
+ALTER TABLE movie_genres
+    ALTER COLUMN movie_key SET NOT NULL,
+    ADD FOREIGN KEY (movie_key) REFERENCES movies (movie_key) ON DELETE CASCADE,
+    ADD PRIMARY KEY (movie_key, genre_id);
+
+ALTER TABLE movie_people ADD COLUMN movie_key INT;
+UPDATE movie_people t SET movie_key = m.movie_key FROM movies m WHERE m.imdb_id = t.movie_id;
+ALTER TABLE movie_people DROP COLUMN movie_id;
+ALTER TABLE movie_people
+    ALTER COLUMN movie_key SET NOT NULL,
+    ADD FOREIGN KEY (movie_key) REFERENCES movies (movie_key) ON DELETE CASCADE,
+    ADD PRIMARY KEY (movie_key, person_id, role);
+
+ALTER TABLE movie_countries ADD COLUMN movie_key INT;
+UPDATE movie_countries t SET movie_key = m.movie_key FROM movies m WHERE m.imdb_id = t.movie_id;
+ALTER TABLE movie_countries DROP COLUMN movie_id;
+ALTER TABLE movie_countries
+    ALTER COLUMN movie_key SET NOT NULL,
+    ADD FOREIGN KEY (movie_key) REFERENCES movies (movie_key) ON DELETE CASCADE,
+    ADD PRIMARY KEY (movie_key, country_id);
+
+ALTER TABLE movie_languages ADD COLUMN movie_key INT;
+UPDATE movie_languages t SET movie_key = m.movie_key FROM movies m WHERE m.imdb_id = t.movie_id;
+ALTER TABLE movie_languages DROP COLUMN movie_id;
+ALTER TABLE movie_languages
+    ALTER COLUMN movie_key SET NOT NULL,
+    ADD FOREIGN KEY (movie_key) REFERENCES movies (movie_key) ON DELETE CASCADE,
+    ADD PRIMARY KEY (movie_key, language_id);
+
+-- ------------------------------------------------------------------------------
+-- 3. Notas: uma linha por review -> um array por filme
+-- ------------------------------------------------------------------------------
+-- Amostras de notas do JSON (1:1 com movies)
+-- Uma linha por filme com todas as notas em um array, na ordem do JSON:
+-- evita o overhead de uma tupla + entradas de índice por review.
+CREATE TABLE movie_rating_samples (
+    movie_key    INT PRIMARY KEY REFERENCES movies (movie_key) ON DELETE CASCADE,
+    scores       SMALLINT[] NOT NULL CHECK (0 <= ALL (scores) AND 100 >= ALL (scores))
+);
+
+-- Preserva a ordem original das amostras (sample_index)
+INSERT INTO movie_rating_samples (movie_key, scores)
+SELECT m.movie_key, array_agg(rs.score_value ORDER BY rs.sample_index)
+FROM rating_samples rs
+JOIN movies m ON m.imdb_id = rs.movie_id
+GROUP BY m.movie_key;
+
+-- Remove a tabela antiga (e idx_rating_samples_movie) antes de criar a visão de mesmo nome
+DROP TABLE rating_samples;
+
+COMMENT ON TABLE movie_rating_samples IS 'Notas dos críticos (Metacritic) por filme, armazenadas como array na ordem original.';
+
+-- Visão compatível com o layout antigo (uma linha por review)
+CREATE OR REPLACE VIEW rating_samples AS
+SELECT
+    m.imdb_id AS movie_id,
+    u.score_value,
+    u.sample_index::INT AS sample_index
+FROM movie_rating_samples s
+JOIN movies m ON s.movie_key = m.movie_key
+CROSS JOIN LATERAL unnest(s.scores) WITH ORDINALITY AS u (score_value, sample_index);
+
+COMMENT ON VIEW rating_samples IS 'Uma linha por nota (movie_id, score_value, sample_index), derivada de movie_rating_samples.';
+
+-- ------------------------------------------------------------------------------
+-- 4. Índices auxiliares
+-- ------------------------------------------------------------------------------
+DROP INDEX IF EXISTS idx_movie_people_person, idx_movie_genres_genre,
+    idx_movie_countries_country, idx_movie_languages_language;
+
+-- Índices auxiliares para performance
+-- As PKs (movie_key, ...) já cobrem as buscas por filme; os índices abaixo cobrem
+-- os demais padrões de acesso das views e do data_loader (index-only scans).
+-- Contagens por papel (num_directors/num_writers/num_cast) e pedigree por papel
+CREATE INDEX idx_movie_people_movie_role ON movie_people (movie_key, role) INCLUDE (person_id, cast_order);
+-- Histórico de indicações por pessoa
+CREATE INDEX idx_movie_people_person ON movie_people (person_id, movie_key);
+-- Buscas reversas (filmes de um gênero/país/idioma)
+CREATE INDEX idx_movie_genres_genre ON movie_genres (genre_id, movie_key);
+CREATE INDEX idx_movie_countries_country ON movie_countries (country_id, movie_key);
+CREATE INDEX idx_movie_languages_language ON movie_languages (language_id, movie_key);
+
+-- ------------------------------------------------------------------------------
+-- 5. Estatísticas, histórico de indicações, dataset de ML e splits (como no schema.sql)
+-- ------------------------------------------------------------------------------
+-- Estatísticas das amostras (1:1 com movies)
+-- Mantida pelo ETL (populate_db.py), que recalcula apenas os filmes cujas amostras mudaram
+-- usando scores_processor.rating_stats_from_scores_map (mesmo código das features em Python).
+CREATE TABLE movie_rating_stats (
+    movie_id          VARCHAR(15) PRIMARY KEY REFERENCES movies (imdb_id) ON DELETE CASCADE,
+    n_samples         INT NOT NULL DEFAULT 0,
+    mean_score        DOUBLE PRECISION,
+    median_score      DOUBLE PRECISION,
+    stddev_score      DOUBLE PRECISION,
+    p90_score         DOUBLE PRECISION,
+    min_score         SMALLINT,
+    max_score         SMALLINT,
+    trimmed_mean_10   DOUBLE PRECISION,
+    trimmed_mean_20   DOUBLE PRECISION,
+    iqr_score         DOUBLE PRECISION,
+    mad_score         DOUBLE PRECISION,
+    skewness          DOUBLE PRECISION,
+    excess_kurtosis   DOUBLE PRECISION,
+    p_ge_90           DOUBLE PRECISION,
+    p_ge_80           DOUBLE PRECISION,
+    p_green_61_100    DOUBLE PRECISION,
+    p_yellow_40_60    DOUBLE PRECISION,
+    p_red_0_39        DOUBLE PRECISION,
+    entropy_gyr_bits  DOUBLE PRECISION
+);
+
+COMMENT ON TABLE movie_rating_stats IS 'Estatísticas das amostras de notas: média, mediana, desvio‑padrão populacional, percentil 90, mínimo, máximo, número de amostras e features robustas (médias aparadas, IQR, MAD, assimetria, curtose, proporções por faixa e entropia).';
+
+-- Histórico de indicações por pessoa (base das features de pedigree)
+-- Uma linha por (pessoa, filme indicado ao Oscar em que ela tem algum crédito, em qualquer papel).
+-- Bem menor que movie_people (só filmes indicados) e indexada por (person_id, release_year),
+-- o que permite buscar "filmes indicados da pessoa antes do ano X" com um range scan.
+CREATE TABLE person_nomination_history (
+    person_id     INT NOT NULL REFERENCES people (id) ON DELETE CASCADE,
+    release_year  INT NOT NULL,
+    movie_key     INT NOT NULL REFERENCES movies (movie_key) ON DELETE CASCADE,
+    PRIMARY KEY (person_id, release_year, movie_key)
+);
+
+COMMENT ON TABLE person_nomination_history IS 'Filmes indicados ao Oscar de cada pessoa (qualquer papel), com o ano de lançamento. Recalculada por refresh_person_nomination_history().';
+
+-- Reconstrói o histórico com um único INSERT ... SELECT DISTINCT sobre os créditos de filmes indicados.
+CREATE OR REPLACE FUNCTION refresh_person_nomination_history()
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n_rows INT;
+BEGIN
+    DELETE FROM person_nomination_history;
+
+    INSERT INTO person_nomination_history (person_id, release_year, movie_key)
+    SELECT DISTINCT mp.person_id, m.release_year, m.movie_key
+    FROM movie_people mp
+    JOIN movies m ON mp.movie_key = m.movie_key
+    WHERE m.nominated_oscar;
+
+    GET DIAGNOSTICS n_rows = ROW_COUNT;
+    ANALYZE person_nomination_history;
+    RETURN n_rows;
+END;
+$$;
+
+-- View para geração de dataset de treinamento de ML
+-- Concatena features numéricas, contagens de atributos categóricos e features derivadas
+CREATE OR REPLACE VIEW ml_training_dataset AS
+SELECT
+    m.imdb_id,
+    m.original_title,
+    m.release_year,
+    m.imdb_rating,
+    m.imdb_votes,
+    m.runtime_minutes,
+    m.metascore,
+
+    -- Feature derivada: Box Office Rank in Year (posição relativa de bilheteria no ano)
+    RANK() OVER (PARTITION BY m.release_year ORDER BY mbo.worldwide_gross DESC NULLS LAST) AS box_office_rank_in_year,
+    
+    -- Feature derivada: Votes Normalized by Year (z-score de imdb_votes por ano)
+    (CASE 
+        WHEN STDDEV(m.imdb_votes) OVER (PARTITION BY m.release_year) > 0 
+        THEN (m.imdb_votes - AVG(m.imdb_votes) OVER (PARTITION BY m.release_year)) 
+             / STDDEV(m.imdb_votes) OVER (PARTITION BY m.release_year)
+        ELSE NULL 
+    END) AS votes_normalized_by_year,
+    
+    -- Feature derivada: Rating Normalized by Year (z-score de imdb_rating por ano)
+    (CASE 
+        WHEN STDDEV(m.imdb_rating) OVER (PARTITION BY m.release_year) > 0 
+        THEN (m.imdb_rating - AVG(m.imdb_rating) OVER (PARTITION BY m.release_year)) 
+             / STDDEV(m.imdb_rating) OVER (PARTITION BY m.release_year)
+        ELSE NULL 
+    END) AS rating_normalized_by_year,
+    
+    -- Estatísticas de rating samples (Metacritic) - Nulos viram 0
+    COALESCE(rs.n_samples, 0)     AS n_samples,
+    COALESCE(rs.mean_score, 0)    AS mean_score,
+    COALESCE(rs.median_score, 0)  AS median_score,
+    COALESCE(rs.stddev_score, 0)  AS stddev_score,
+    COALESCE(rs.p90_score, 0)     AS p90_score,
+    COALESCE(rs.min_score, 0)     AS min_score,
+    COALESCE(rs.max_score, 0)     AS max_score,
+    COALESCE(rs.trimmed_mean_10, 0)  AS trimmed_mean_10,
+    COALESCE(rs.trimmed_mean_20, 0)  AS trimmed_mean_20,
+    COALESCE(rs.iqr_score, 0)        AS iqr_score,
+    COALESCE(rs.mad_score, 0)        AS mad_score,
+    COALESCE(rs.skewness, 0)         AS skewness,
+    COALESCE(rs.excess_kurtosis, 0)  AS excess_kurtosis,
+    COALESCE(rs.p_ge_90, 0)          AS p_ge_90,
+    COALESCE(rs.p_ge_80, 0)          AS p_ge_80,
+    COALESCE(rs.p_green_61_100, 0)   AS p_green_61_100,
+    COALESCE(rs.p_yellow_40_60, 0)   AS p_yellow_40_60,
+    COALESCE(rs.p_red_0_39, 0)       AS p_red_0_39,
+    COALESCE(rs.entropy_gyr_bits, 0) AS entropy_gyr_bits,
+    
+    -- Contagens de atributos categóricos
+    COALESCE(gen.num_genres, 0)     AS num_genres,
+    COALESCE(ctr.num_countries, 0)  AS num_countries,
+    COALESCE(lng.num_languages, 0)  AS num_languages,
+    COALESCE(ppl.num_directors, 0)  AS num_directors,
+    COALESCE(ppl.num_writers, 0)    AS num_writers,
+    COALESCE(ppl.num_cast, 0)       AS num_cast,
+    
+    -- Feature 1: Pedigree (Diretor/Elenco) - Quantos filmes anteriores indicados distintos
+    -- os diretores/atores do filme têm (um filme compartilhado por duas pessoas conta uma vez)
+    COALESCE(ped.director_prev_nominations, 0) AS director_prev_nominations,
+    COALESCE(ped.cast_prev_nominations, 0)     AS cast_prev_nominations,
+
+    -- Feature 2: Buzz (Gêneros Oscar-Bait)
+    COALESCE(gen.is_drama, 0)       AS is_drama,
+    COALESCE(gen.is_biography, 0)   AS is_biography,
+    COALESCE(gen.is_history, 0)     AS is_history,
+    
+    -- Rótulo (label) para ML
+    m.nominated_oscar::INT AS label -- rótulo binário (1=indicado, 0=não indicado)
+FROM movies m
+LEFT JOIN movie_box_office mbo ON m.imdb_id = mbo.movie_id
+LEFT JOIN movie_rating_stats rs ON m.imdb_id = rs.movie_id
+-- Uma única agregação por tabela de associação (GROUP BY filme + FILTER).
+-- Nova flag de gênero = mais uma linha BOOL_OR abaixo, sem varredura extra.
+LEFT JOIN (
+    SELECT
+        mg.movie_key,
+        COUNT(*)                                 AS num_genres,
+        BOOL_OR(g.name = 'Drama')::INT           AS is_drama,
+        BOOL_OR(g.name = 'Biography')::INT       AS is_biography,
+        BOOL_OR(g.name = 'History')::INT         AS is_history
+    FROM movie_genres mg
+    JOIN genres g ON mg.genre_id = g.id
+    GROUP BY mg.movie_key
+) gen ON m.movie_key = gen.movie_key
+LEFT JOIN (
+    SELECT movie_key, COUNT(*) AS num_countries FROM movie_countries GROUP BY movie_key
+) ctr ON m.movie_key = ctr.movie_key
+LEFT JOIN (
+    SELECT movie_key, COUNT(*) AS num_languages FROM movie_languages GROUP BY movie_key
+) lng ON m.movie_key = lng.movie_key
+LEFT JOIN (
+    SELECT
+        mp.movie_key,
+        COUNT(*) FILTER (WHERE mp.role = 'director')                         AS num_directors,
+        COUNT(*) FILTER (WHERE mp.role = 'writer')                           AS num_writers,
+        COUNT(*) FILTER (WHERE mp.role = 'cast')                             AS num_cast
+    FROM movie_people mp
+    GROUP BY mp.movie_key
+) ppl ON m.movie_key = ppl.movie_key
+-- Pedigree: range join com o histórico (h.release_year < ano do filme) + COUNT(DISTINCT).
+-- Custo: uma linha por (crédito de diretor/elenco, filme indicado anterior da pessoa), ou seja,
+-- cresce com o quadrado da filmografia *indicada* de cada pessoa (no catálogo 2000-2025: no
+-- máximo 10 filmes por pessoa, ~4 mil linhas de join para ~27 mil créditos). Contagens
+-- acumuladas por (pessoa, ano) via window function seriam lineares, mas somariam por pessoa
+-- e contariam duas vezes um filme compartilhado por dois diretores/atores do mesmo filme.
+LEFT JOIN (
+    SELECT
+        mp.movie_key,
+        COUNT(DISTINCT h.movie_key) FILTER (WHERE mp.role = 'director') AS director_prev_nominations,
+        COUNT(DISTINCT h.movie_key) FILTER (WHERE mp.role = 'cast')     AS cast_prev_nominations
+    FROM movie_people mp
+    JOIN movies mm ON mp.movie_key = mm.movie_key
+    JOIN person_nomination_history h
+      ON h.person_id = mp.person_id AND h.release_year < mm.release_year
+    WHERE mp.role IN ('director', 'cast')
+    GROUP BY mp.movie_key
+) ped ON m.movie_key = ped.movie_key;
+
+COMMENT ON VIEW ml_training_dataset IS 'Dataset para treinamento de modelo de classificação de indicação ao Oscar. Inclui features numéricas, features derivadas (ROI, market share, z-scores, rank), estatísticas de ratings, contagens de categorias e o rótulo binário.';
+
+-- ==============================================================================
+-- DATASET DE ML MATERIALIZADO (EVITA RECALCULAR A VIEW A CADA SELECT)
+-- ==============================================================================
+
+-- Cópia materializada de ml_training_dataset, com as mesmas colunas
+CREATE TABLE ml_training_dataset_mat AS
+SELECT * FROM ml_training_dataset
+WITH NO DATA;
+
+ALTER TABLE ml_training_dataset_mat ADD PRIMARY KEY (imdb_id);
+CREATE INDEX idx_ml_training_dataset_mat_year ON ml_training_dataset_mat (release_year);
+
+COMMENT ON TABLE ml_training_dataset_mat IS 'Versão materializada e indexada de ml_training_dataset. Atualizada pelo ETL via refresh_ml_training_dataset().';
+
+-- Atualiza a tabela materializada a partir de um ano (ou por completo quando p_from_year é NULL).
+-- As features de um ano dependem apenas do próprio ano (z-scores, rank) e de anos anteriores
+-- (pedigree), então recalcular de p_from_year em diante é suficiente após uma carga incremental.
+-- Roda em uma única transação: leitores continuam vendo os dados antigos até o commit.
+CREATE OR REPLACE FUNCTION refresh_ml_training_dataset(p_from_year INT DEFAULT NULL)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n_rows INT;
+BEGIN
+    -- O pedigree depende de todos os anos anteriores: recalcula o histórico antes
+    PERFORM refresh_person_nomination_history();
+
+    IF p_from_year IS NULL THEN
+        DELETE FROM ml_training_dataset_mat;
+        INSERT INTO ml_training_dataset_mat
+        SELECT * FROM ml_training_dataset;
+    ELSE
+        DELETE FROM ml_training_dataset_mat WHERE release_year >= p_from_year;
+        INSERT INTO ml_training_dataset_mat
+        SELECT * FROM ml_training_dataset WHERE release_year >= p_from_year;
+    END IF;
+
+    GET DIAGNOSTICS n_rows = ROW_COUNT;
+    ANALYZE ml_training_dataset_mat;
+    RETURN n_rows;
+END;
+$$;
+
+COMMENT ON FUNCTION refresh_ml_training_dataset(INT) IS 'Recalcula ml_training_dataset_mat para release_year >= p_from_year (NULL = tudo). Retorna o número de linhas inseridas.';
+
+-- ==============================================================================
+-- VIEWS DE SPLIT TEMPORAL (CRÍTICO PARA EVITAR DATA LEAKAGE)
+-- ==============================================================================
+
+-- 1. Conjunto de Treino (2000-2019) - 20 anos
+-- Usado para treinar os modelos
+CREATE OR REPLACE VIEW ml_split_train AS
+SELECT * FROM ml_training_dataset_mat
+WHERE release_year BETWEEN 2000 AND 2019;
+
+COMMENT ON VIEW ml_split_train IS 'Conjunto de Treino (2000-2019). Usado para treinar os modelos.';
+
+-- 2. Conjunto de Validação (2020-2022) - 3 anos
+-- Usado para tunar hiperparâmetros e avaliar métricas durante desenvolvimento
+CREATE OR REPLACE VIEW ml_split_validation AS
+SELECT * FROM ml_training_dataset_mat
+WHERE release_year BETWEEN 2020 AND 2022;
+
+COMMENT ON VIEW ml_split_validation IS 'Conjunto de Validação (2020-2022). Usado para tuning e avaliação preliminar.';
+
+-- 3. Conjunto de Teste (2023-2024) - 2 anos
+-- Usado APENAS para avaliação final do modelo escolhido
+CREATE OR REPLACE VIEW ml_split_test AS
+SELECT * FROM ml_training_dataset_mat
+WHERE release_year BETWEEN 2023 AND 2024;
+
+COMMENT ON VIEW ml_split_test IS 'Conjunto de Teste (2023-2024). Usado apenas para avaliação final (holdout).';
+
+-- 4. Conjunto de Predição (2025) - Futuro
+-- Dados onde aplicaremos o modelo para gerar as predições do Oscar 2025
+CREATE OR REPLACE VIEW ml_split_prediction_2025 AS
+SELECT * FROM ml_training_dataset_mat
+WHERE release_year = 2025;
+
+COMMENT ON VIEW ml_split_prediction_2025 IS 'Conjunto de Predição (2025). Filmes alvo para predição do Oscar.';
+
+COMMIT;
+
+ANALYZE movies;
+ANALYZE movie_genres;
+ANALYZE movie_people;
+ANALYZE movie_countries;
+ANALYZE movie_languages;
+ANALYZE movie_rating_samples;
@@ -0,0 +1,209 @@
+"""
+Cached SHAP explanations for the saved Oscar model.
+
+Explains the artifacts written by src/pipeline.py (CatBoost, or XGBoost
+pipelines with the same layout):
+- SHAP values come from the model's native TreeSHAP (CatBoost ShapValues,
+  XGBoost pred_contribs); other models fall back to shap.TreeExplainer.
+- Rows are explained in parallel chunks (the native code releases the GIL).
+- Results are cached per artifact version in models/<version>/shap_cache.npz,
+  keyed by a hash of the row's feature values, so explaining the same
+  candidates again is a lookup.
+
+Contributions are in log-odds and refer to the model inputs after the
+pipeline's imputer/scaler (one column per NUMERIC_FEATURES entry).
+
+Usage (from machine-learning/):
+    python -m src.explain --year 2025 --top 5
+    python -m src.explain --imdb-id tt16311594 tt31193180
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline import ID_COLUMNS, MODELS_DIR, load_artifact, load_candidates
+from src.text_features import ensure_text_features
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CACHE_FILE = "shap_cache.npz"
+CHUNK_ROWS = 512
+DEFAULT_TOP = 5
+
+# ============================================================================
+# SHAP VALUES
+# ============================================================================
+
+def row_hashes(df, features):
+    """64-bit hash of each row's feature values (column order fixed by `features`)."""
+    return pd.util.hash_pandas_object(df[features].astype(np.float64), index=False).to_numpy(dtype=np.uint64)
+
+
+def _native_shap(model, X):
+    """SHAP values + base value for one chunk of transformed features; returns (n, f + 1) array."""
+    if type(model).__name__.startswith('CatBoost'):
+        from catboost import Pool
+        return model.get_feature_importance(Pool(X), type='ShapValues', thread_count=1)
+    if type(model).__name__.startswith('XGB'):
+        from xgboost import DMatrix
+        return model.get_booster().predict(DMatrix(X), pred_contribs=True)
+
+    import shap
+    explainer = shap.TreeExplainer(model)
+    values = explainer.shap_values(X)
+    if isinstance(values, list):  # one array per class
+        values = values[1]
+    base = np.atleast_1d(explainer.expected_value)[-1]
+    return np.column_stack([values, np.full(len(X), base)])
+
+
+def compute_shap(artifact, df, n_jobs=None, chunk_rows=CHUNK_ROWS):
+    """
+    SHAP values for every row of `df`, computed in parallel chunks.
+
+    Args:
+        artifact: Dict returned by load_artifact()
+        df: DataFrame with the model features
+        n_jobs: Worker threads (default: all cores)
+        chunk_rows: Rows per chunk
+
+    Returns:
+        numpy.ndarray: float32 array (n_rows, n_features + 1); last column is the base value
+    """
+    df = ensure_text_features(df, artifact['metadata'])
+    X = artifact['preprocessor'].transform(df[artifact['metadata']['features']])
+    chunks = [X[i:i + chunk_rows] for i in range(0, len(X), chunk_rows)]
+    if not chunks:
+        return np.empty((0, X.shape[1] + 1), dtype=np.float32)
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1) as executor:
+        parts = list(executor.map(lambda chunk: _native_shap(artifact['model'], chunk), chunks))
+    return np.vstack(parts).astype(np.float32)
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class ShapCache:
+    """SHAP values of one artifact version, keyed by feature-row hash."""
+
+    def __init__(self, version, models_dir=MODELS_DIR):
+        self.path = Path(models_dir) / version / CACHE_FILE
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.values = None
+        if self.path.exists():
+            with np.load(self.path) as data:
+                self.hashes, self.values = data['hashes'], data['values']
+        self._index = {h: i for i, h in enumerate(self.hashes.tolist())}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def lookup(self, hashes):
+        """Row positions in the cache (-1 for misses)."""
+        return np.array([self._index.get(h, -1) for h in hashes.tolist()], dtype=np.int64)
+
+    def add(self, hashes, values):
+        """Append new rows and rewrite the cache file atomically."""
+        start = len(self.hashes)
+        self.hashes = np.concatenate([self.hashes, hashes])
+        self.values = values if self.values is None else np.vstack([self.values, values])
+        self._index.update({h: start + i for i, h in enumerate(hashes.tolist())})
+        temp_file = self.path.with_name(self.path.name + '.tmp.npz')
+        np.savez(temp_file, hashes=self.hashes, values=self.values)
+        os.replace(temp_file, self.path)
+
+
+def explain(artifact, df, n_jobs=None, models_dir=MODELS_DIR):
+    """
+    SHAP values for `df`, from the cache when possible.
+
+    Args:
+        artifact: Dict returned by load_artifact()
+        df: DataFrame with the model features
+        n_jobs: Worker threads for the rows not in the cache
+        models_dir: Root directory for model versions
+
+    Returns:
+        tuple: (float32 array (n_rows, n_features + 1), number of cache hits)
+    """
+    features = artifact['metadata']['features']
+    df = ensure_text_features(df, artifact['metadata'])
+    cache = ShapCache(artifact['metadata']['version'], models_dir)
+    hashes = row_hashes(df, features)
+    positions = cache.lookup(hashes)
+
+    missing = np.flatnonzero(positions < 0)
+    if len(missing):
+        # Duplicate rows inside the request are computed once
+        new_hashes, first = np.unique(hashes[missing], return_index=True)
+        cache.add(new_hashes, compute_shap(artifact, df.iloc[missing[first]], n_jobs))
+        positions = cache.lookup(hashes)
+
+    n_hits = len(hashes) - len(missing)
+    return cache.values[positions], n_hits
+
+
+def top_contributors(artifact, df, k=DEFAULT_TOP, n_jobs=None, models_dir=MODELS_DIR):
+    """
+    Per-movie top-k features by absolute SHAP contribution.
+
+    Returns:
+        tuple: (DataFrame with one row per (movie, rank), number of cache hits)
+    """
+    features = artifact['metadata']['features']
+    df = ensure_text_features(df, artifact['metadata'])
+    values, n_hits = explain(artifact, df, n_jobs, models_dir)
+    contributions = values[:, :-1]
+    order = np.argsort(-np.abs(contributions), axis=1)[:, :k]
+
+    id_columns = [col for col in ID_COLUMNS if col in df.columns]
+    rows = []
+    for i, (_, movie) in enumerate(df.iterrows()):
+        for rank, j in enumerate(order[i], start=1):
+            rows.append({
+                **{col: movie[col] for col in id_columns},
+                'rank': rank,
+                'feature': features[j],
+                'value': movie[features[j]],
+                'shap': float(contributions[i, j]),
+            })
+    return pd.DataFrame(rows), n_hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SHAP explanations for the saved Oscar model.")
+    parser.add_argument('--year', type=int, default=2025, help='Release year to explain (database)')
+    parser.add_argument('--input', type=Path, default=None, help='CSV/Parquet with NUMERIC_FEATURES')
+    parser.add_argument('--imdb-id', nargs='+', default=None, help='Only these movies')
+    parser.add_argument('--version', default=None, help='Model version (default: LATEST)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='Contributors per movie')
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--output', type=Path, default=None, help='CSV to write the contributors to')
+    args = parser.parse_args()
+
+    artifact = load_artifact(args.version)
+    candidates = load_candidates(args.year, args.input)
+    if args.imdb_id:
+        candidates = candidates[candidates['imdb_id'].isin(args.imdb_id)]
+
+    start = time.perf_counter()
+    contributors, n_hits = top_contributors(artifact, candidates.reset_index(drop=True), args.top, args.n_jobs)
+    elapsed_ms = 1000 * (time.perf_counter() - start)
+    print(f"✅ Explained {len(candidates)} movies with model {artifact['metadata']['version']} "
+          f"in {elapsed_ms:.1f} ms ({n_hits} from cache)")
+    print(contributors.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    if args.output:
+        contributors.to_csv(args.output, index=False)
+        print(f"💾 Contributors saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
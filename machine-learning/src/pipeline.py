@@ -0,0 +1,369 @@
+"""
+Training and prediction pipeline for the Oscar nomination model.
+
+Packages the flow of notebooks/05_master_pipeline.ipynb: train on the
+ml_split_* views, pick the recall-90 threshold on validation, evaluate on
+test, refit on everything and save a versioned artifact. `predict` only loads
+the artifact and scores candidates.
+
+Usage (from machine-learning/):
+    python -m src.pipeline train
+    python -m src.pipeline predict --year 2025 --top 15
+    python -m src.pipeline predict --input candidates.csv --output scores.csv
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
+LATEST_FILE = "LATEST"
+ARTIFACT_FILE = "artifact.joblib"
+METADATA_FILE = "metadata.json"
+
+# Same features and target as notebook 05
+NUMERIC_FEATURES = [
+    'imdb_rating', 'imdb_votes', 'runtime_minutes', 'metascore',
+    'n_samples', 'mean_score', 'median_score', 'stddev_score',
+    'box_office_rank_in_year', 'votes_normalized_by_year', 'rating_normalized_by_year',
+    'num_genres', 'num_countries', 'num_languages', 'num_cast',
+    'director_prev_nominations', 'cast_prev_nominations',
+    'is_drama', 'is_biography', 'is_history'
+]
+TARGET = 'label'
+ID_COLUMNS = ['imdb_id', 'original_title', 'release_year']
+
+TARGET_RECALL = 0.90
+CATBOOST_PARAMS = {
+    'iterations': 1000,
+    'learning_rate': 0.03,
+    'depth': 6,
+    'auto_class_weights': 'Balanced',
+    'verbose': 0,
+    'random_state': 42,
+    'allow_writing_files': False,
+}
+
+SPLIT_VIEWS = {
+    'train': 'ml_split_train',            # 2000-2019
+    'validation': 'ml_split_validation',  # 2020-2022
+    'test': 'ml_split_test',              # 2023-2024
+    'prediction': 'ml_split_prediction_2025',
+}
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def get_engine():
+    """
+    Create a SQLAlchemy engine from the DB_* variables in .env
+    (same defaults as data_base_construction/db_populate_scipts/data_loader.py).
+    """
+    from sqlalchemy import create_engine
+
+    load_dotenv()
+    user = os.getenv('DB_USER', 'postgres')
+    password = os.getenv('DB_PASSWORD', 'postgres')
+    host = os.getenv('DB_HOST', 'localhost')
+    port = os.getenv('DB_PORT', '5432')
+    database = os.getenv('DB_NAME', 'moviesdb')
+    return create_engine(f"postgresql://{user}:{password}@{host}:{port}/{database}")
+
+
+def load_splits(engine=None, names=('train', 'validation', 'test')):
+    """
+    Load the leakage-safe temporal splits from the ml_split_* views.
+
+    Args:
+        engine: SQLAlchemy engine (created from .env if None)
+        names: Keys of SPLIT_VIEWS to load
+
+    Returns:
+        dict: split name -> pandas DataFrame
+    """
+    engine = engine or get_engine()
+    return {name: pd.read_sql(f"SELECT * FROM {SPLIT_VIEWS[name]}", engine) for name in names}
+
+
+def load_candidates(year=None, input_path=None, engine=None):
+    """
+    Load movies to score, either from a file (CSV/Parquet with NUMERIC_FEATURES)
+    or from ml_training_dataset_mat for one release year.
+
+    Args:
+        year: Release year to score (database source)
+        input_path: CSV or Parquet file (takes precedence over the database)
+        engine: SQLAlchemy engine (created from .env if None)
+
+    Returns:
+        pandas.DataFrame: Candidate rows
+    """
+    if input_path:
+        input_path = Path(input_path)
+        if input_path.suffix == '.parquet':
+            return pd.read_parquet(input_path)
+        return pd.read_csv(input_path)
+
+    from sqlalchemy import text
+
+    engine = engine or get_engine()
+    query = text("SELECT * FROM ml_training_dataset_mat WHERE release_year = :year")
+    return pd.read_sql(query, engine, params={'year': int(year)})
+
+# ============================================================================
+# MODEL
+# ============================================================================
+
+def get_model(params=None, features=None):
+    """
+    Build the notebook 05 pipeline: median imputation + StandardScaler + CatBoost.
+
+    Args:
+        params: Overrides for CATBOOST_PARAMS
+        features: Input columns (default: NUMERIC_FEATURES)
+
+    Returns:
+        sklearn.pipeline.Pipeline: Unfitted pipeline
+    """
+    from catboost import CatBoostClassifier
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler())
+    ])
+    preprocessor = ColumnTransformer(transformers=[('num', numeric_transformer, features or NUMERIC_FEATURES)])
+    return Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('classifier', CatBoostClassifier(**{**CATBOOST_PARAMS, **(params or {})}))
+    ])
+
+
+def recall_threshold(y_true, y_prob, target_recall=TARGET_RECALL):
+    """
+    Threshold rule from notebook 05: the first point of the precision-recall
+    curve where recall drops to `target_recall` or below.
+
+    Args:
+        y_true: True labels
+        y_prob: Predicted probabilities for the positive class
+        target_recall: Recall to keep
+
+    Returns:
+        float: Decision threshold
+    """
+    from sklearn.metrics import precision_recall_curve
+
+    _, recalls, thresholds = precision_recall_curve(y_true, y_prob)
+    optimal_idx = np.argmax(recalls <= target_recall)
+    return float(thresholds[optimal_idx])
+
+
+def train(engine=None, params=None, target_recall=TARGET_RECALL, text_features=False):
+    """
+    Train, calibrate the threshold, evaluate and refit on all labelled years.
+
+    Args:
+        engine: SQLAlchemy engine (created from .env if None)
+        params: Overrides for CATBOOST_PARAMS
+        target_recall: Recall used to choose the threshold on validation
+        text_features: Also use the precomputed synopsis vectors (src/text_features.py)
+
+    Returns:
+        dict: Artifact with the fitted pipeline, threshold and metadata
+    """
+    from sklearn.metrics import roc_auc_score
+
+    splits = load_splits(engine)
+    features = list(NUMERIC_FEATURES)
+    text_projection = None
+    if text_features:
+        from src.text_features import TEXT_FEATURES, TextFeatureStore, join_text_features
+
+        # Scoring checks the store against this fingerprint (see text_features.ensure_text_features)
+        text_projection = TextFeatureStore().projection
+        splits = {name: join_text_features(df, text_projection) for name, df in splits.items()}
+        features += TEXT_FEATURES
+    train_df, val_df, test_df = splits['train'], splits['validation'], splits['test']
+
+    start = time.perf_counter()
+    model = get_model(params, features)
+    model.fit(train_df[features], train_df[TARGET])
+
+    y_prob_val = model.predict_proba(val_df[features])[:, 1]
+    optimal_threshold = recall_threshold(val_df[TARGET], y_prob_val, target_recall)
+    y_prob_test = model.predict_proba(test_df[features])[:, 1]
+    y_pred_test = (y_prob_test >= optimal_threshold).astype(int)
+
+    metrics = {
+        'val_roc_auc': float(roc_auc_score(val_df[TARGET], y_prob_val)),
+        'test_roc_auc': float(roc_auc_score(test_df[TARGET], y_prob_test)),
+        'test_recall': float(y_pred_test[test_df[TARGET].to_numpy() == 1].mean()),
+        'test_flagged': int(y_pred_test.sum()),
+    }
+
+    # Final model on every labelled year (same as notebook 05)
+    full_df = pd.concat([train_df, val_df, test_df], ignore_index=True)
+    final_model = get_model(params, features)
+    final_model.fit(full_df[features], full_df[TARGET])
+    train_seconds = time.perf_counter() - start
+
+    return {
+        'pipeline': final_model,
+        'preprocessor': final_model.named_steps['preprocessor'],
+        'model': final_model.named_steps['classifier'],
+        'optimal_threshold': optimal_threshold,
+        'metadata': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'features': features,
+            'text_projection': text_projection,
+            'params': {**CATBOOST_PARAMS, **(params or {})},
+            'target_recall': target_recall,
+            'optimal_threshold': optimal_threshold,
+            'metrics': metrics,
+            'train_rows': len(full_df),
+            'train_years': [int(full_df['release_year'].min()), int(full_df['release_year'].max())],
+            'train_seconds': train_seconds,
+        },
+    }
+
+# ============================================================================
+# ARTIFACTS
+# ============================================================================
+
+def save_artifact(artifact, models_dir=MODELS_DIR):
+    """
+    Save the artifact as models/<version>/ and point models/LATEST at it.
+
+    Args:
+        artifact: Dict returned by train()
+        models_dir: Root directory for model versions
+
+    Returns:
+        str: Version name
+    """
+    models_dir = Path(models_dir)
+    version = datetime.now().strftime('v%Y%m%d_%H%M%S')
+    artifact['metadata']['version'] = version
+    version_dir = models_dir / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+
+    joblib.dump(artifact, version_dir / ARTIFACT_FILE)
+    with open(version_dir / METADATA_FILE, 'w', encoding='utf-8') as f:
+        json.dump(artifact['metadata'], f, indent=2)
+    (models_dir / LATEST_FILE).write_text(version + '\n', encoding='utf-8')
+    return version
+
+
+def load_artifact(version=None, models_dir=MODELS_DIR):
+    """
+    Load a saved artifact (latest version by default).
+
+    Args:
+        version: Version name (e.g. v20250101_120000) or None for LATEST
+        models_dir: Root directory for model versions
+
+    Returns:
+        dict: Artifact with pipeline, preprocessor, model, optimal_threshold and metadata
+    """
+    models_dir = Path(models_dir)
+    if version is None:
+        latest = models_dir / LATEST_FILE
+        if not latest.exists():
+            raise FileNotFoundError(f"No trained model in {models_dir} (run: python -m src.pipeline train)")
+        version = latest.read_text(encoding='utf-8').strip()
+    return joblib.load(models_dir / version / ARTIFACT_FILE)
+
+
+def predict(artifact, df):
+    """
+    Score candidates with a loaded artifact.
+
+    Args:
+        artifact: Dict returned by load_artifact()
+        df: DataFrame with NUMERIC_FEATURES (extra columns are kept); synopsis
+            vectors are joined by imdb_id if the model uses them
+
+    Returns:
+        pandas.DataFrame: Input identifiers plus oscar_probability and
+        predicted_nominee, sorted by probability
+    """
+    from src.text_features import ensure_text_features
+
+    df = ensure_text_features(df, artifact['metadata'])
+    probs = artifact['pipeline'].predict_proba(df[artifact['metadata']['features']])[:, 1]
+    id_columns = [col for col in ID_COLUMNS if col in df.columns]
+    result = df[id_columns].copy()
+    result['oscar_probability'] = probs
+    result['predicted_nominee'] = (probs >= artifact['optimal_threshold']).astype(int)
+    return result.sort_values('oscar_probability', ascending=False, ignore_index=True)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or run the Oscar nomination model.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = sub.add_parser('train', help='Train and save a new model version')
+    train_parser.add_argument('--models-dir', type=Path, default=MODELS_DIR)
+    train_parser.add_argument('--target-recall', type=float, default=TARGET_RECALL)
+    train_parser.add_argument('--text-features', action='store_true',
+                              help='Add the synopsis vectors (run src.text_features update first)')
+
+    predict_parser = sub.add_parser('predict', help='Score candidates with a saved model')
+    predict_parser.add_argument('--year', type=int, default=2025, help='Release year to score (database)')
+    predict_parser.add_argument('--input', type=Path, default=None, help='CSV/Parquet with NUMERIC_FEATURES')
+    predict_parser.add_argument('--output', type=Path, default=None, help='CSV to write the scores to')
+    predict_parser.add_argument('--version', default=None, help='Model version (default: LATEST)')
+    predict_parser.add_argument('--models-dir', type=Path, default=MODELS_DIR)
+    predict_parser.add_argument('--top', type=int, default=15, help='Rows to print')
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        print("🚀 Training (train → threshold on validation → test → refit on all years)...")
+        artifact = train(target_recall=args.target_recall, text_features=args.text_features)
+        version = save_artifact(artifact, args.models_dir)
+        meta = artifact['metadata']
+        print(f"✅ Saved {version} to {args.models_dir / version}")
+        print(f"   Threshold (recall ~{args.target_recall:.0%}): {artifact['optimal_threshold']:.4f}")
+        print(f"   ROC-AUC validation: {meta['metrics']['val_roc_auc']:.4f} | test: {meta['metrics']['test_roc_auc']:.4f}")
+        print(f"   Training time: {meta['train_seconds']:.1f}s")
+        return
+
+    start = time.perf_counter()
+    artifact = load_artifact(args.version, args.models_dir)
+    load_seconds = time.perf_counter() - start
+    candidates = load_candidates(args.year, args.input)
+
+    start = time.perf_counter()
+    scores = predict(artifact, candidates)
+    score_ms = 1000 * (time.perf_counter() - start)
+
+    print(f"✅ Model {artifact['metadata']['version']} loaded in {load_seconds * 1000:.0f} ms; "
+          f"scored {len(scores)} movies in {score_ms:.1f} ms")
+    print(scores.head(args.top).to_string(index=False))
+    if args.output:
+        scores.to_csv(args.output, index=False)
+        print(f"💾 Scores saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
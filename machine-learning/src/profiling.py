@@ -0,0 +1,303 @@
+"""
+Single-pass, mergeable dataset profiling.
+
+analyze_missing_values/print_dataset_info (src/utils.py) need the whole
+DataFrame in memory and walk it once per statistic. DatasetProfile reads each
+chunk once and keeps a small fixed-size state per column:
+- row and null counts
+- distinct count estimate (HyperLogLog over pandas row hashes)
+- min/max, mean/std (Chan's parallel moments) for numeric columns
+- a bottom-k uniform sample for approximate quantiles and string memory
+- memory estimate (exact for numpy/Arrow arrays, sampled for object columns)
+
+Profiles of different chunks or processes combine with merge(), so memory
+stays bounded by the chunk size whatever the table size.
+
+Usage:
+    profile = profile_chunks(stream_custom_query("SELECT * FROM movie_people"))
+    profile.missing_summary()      # same columns as analyze_missing_values
+    print_profile(profile, "movie_people")
+
+    python -m src.profiling --query "SELECT * FROM movie_people" --chunksize 50000
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+HLL_PRECISION = 12          # 4096 registers, ~1.6% relative error
+SAMPLE_SIZE = 4096          # values kept per column for quantiles
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DEFAULT_CHUNKSIZE = 100_000
+
+# ============================================================================
+# SKETCHES
+# ============================================================================
+
+def _hll_alpha(m):
+    return 0.7213 / (1 + 1.079 / m)
+
+
+class _ColumnProfile:
+    """Mergeable state of one column."""
+
+    def __init__(self, precision=HLL_PRECISION, sample_size=SAMPLE_SIZE):
+        self.precision = precision
+        self.sample_size = sample_size
+        self.dtype = None
+        self.count = 0
+        self.nulls = 0
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+        self.min = None
+        self.max = None
+        self.n_numeric = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.fixed_bytes = 0
+        self.object_values = 0
+        self.sample_keys = np.empty(0)
+        self.sample_values = np.empty(0, dtype=object)
+
+    # ---------- update ----------
+
+    def update(self, series, rng):
+        self.dtype = str(series.dtype)
+        self.count += len(series)
+        null_mask = series.isna().to_numpy()
+        self.nulls += int(null_mask.sum())
+        if pd.api.types.is_object_dtype(series):
+            # Python objects: sizes estimated from the sample (memory_usage(deep=True) walks every value)
+            self.object_values += len(series) - int(null_mask.sum())
+            self.fixed_bytes += 8 * len(series)
+        else:
+            # numpy/Arrow-backed arrays know their buffer sizes without scanning
+            self.fixed_bytes += series.memory_usage(index=False, deep=True)
+        values = series[~null_mask]
+        if not len(values):
+            return
+
+        self._update_hll(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+        numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        if numeric:
+            arr = values.to_numpy(dtype=np.float64)
+            lo, hi = float(arr.min()), float(arr.max())
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+            self._merge_moments(len(arr), float(arr.mean()), float(((arr - arr.mean()) ** 2).sum()))
+            sample = arr
+        else:
+            sample = values.to_numpy(dtype=object)
+
+        # Bottom-k sample: random key per value, keep the k smallest (uniform, mergeable)
+        keys = rng.random(len(sample))
+        self._merge_sample(keys, sample)
+
+    def _update_hll(self, hashes):
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = (hashes << np.uint64(p)) | np.uint64(1 << (p - 1))  # guard bit bounds the rank
+        # rank = position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - np.floor(np.log2(rest.astype(np.float64))).astype(np.int64)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def _merge_moments(self, n, mean, m2):
+        total = self.n_numeric + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * self.n_numeric * n / total
+        self.mean += delta * n / total
+        self.n_numeric = total
+
+    def _merge_sample(self, keys, values):
+        keys = np.concatenate([self.sample_keys, keys])
+        values = np.concatenate([self.sample_values, np.asarray(values, dtype=object)])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, values = keys[keep], values[keep]
+        self.sample_keys, self.sample_values = keys, values
+
+    # ---------- merge ----------
+
+    def merge(self, other):
+        self.dtype = self.dtype or other.dtype
+        self.count += other.count
+        self.nulls += other.nulls
+        np.maximum(self.registers, other.registers, out=self.registers)
+        for attr, pick in (('min', min), ('max', max)):
+            a, b = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, b if a is None else a if b is None else pick(a, b))
+        if other.n_numeric:
+            self._merge_moments(other.n_numeric, other.mean, other.m2)
+        self.fixed_bytes += other.fixed_bytes
+        self.object_values += other.object_values
+        self._merge_sample(other.sample_keys, other.sample_values)
+
+    # ---------- estimates ----------
+
+    def distinct(self):
+        m = len(self.registers)
+        estimate = _hll_alpha(m) * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(min(estimate, self.count - self.nulls)))
+
+    def memory_bytes(self):
+        if not self.object_values or not len(self.sample_values):
+            return int(self.fixed_bytes)
+        # object columns: pointers (in fixed_bytes) + average size of the sampled objects
+        per_value = np.mean([sys.getsizeof(v) for v in self.sample_values])
+        return int(self.fixed_bytes + self.object_values * per_value)
+
+    def quantiles(self, qs=QUANTILES):
+        if self.n_numeric == 0 or not len(self.sample_values):
+            return {q: np.nan for q in qs}
+        sample = self.sample_values.astype(np.float64)
+        return dict(zip(qs, np.quantile(sample, qs)))
+
+
+class DatasetProfile:
+    """Column profiles for a stream of DataFrame chunks (update once per chunk, merge across workers)."""
+
+    def __init__(self, precision=HLL_PRECISION, sample_size=SAMPLE_SIZE, seed=42):
+        self.precision = precision
+        self.sample_size = sample_size
+        self.rows = 0
+        self.chunks = 0
+        self.columns = {}
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, df):
+        """Add one chunk."""
+        self.rows += len(df)
+        self.chunks += 1
+        for name in df.columns:
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = _ColumnProfile(self.precision, self.sample_size)
+            column.update(df[name], self._rng)
+        return self
+
+    def merge(self, other):
+        """Combine with the profile of other chunks (e.g. from another process)."""
+        self.rows += other.rows
+        self.chunks += other.chunks
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        return self
+
+    def summary(self):
+        """
+        One row per column.
+
+        Returns:
+            pandas.DataFrame: dtype, counts, null %, distinct estimate, min/max,
+            mean/std, approximate quantiles and memory estimate (MB)
+        """
+        rows = []
+        for name, c in self.columns.items():
+            row = {
+                'Column': name,
+                'dtype': c.dtype,
+                'Count': c.count,
+                'Missing_Count': c.nulls,
+                'Missing_Percentage': 100 * c.nulls / c.count if c.count else np.nan,
+                'Distinct_Estimate': c.distinct(),
+                'Min': c.min,
+                'Max': c.max,
+                'Mean': c.mean if c.n_numeric else np.nan,
+                'Std': np.sqrt(c.m2 / (c.n_numeric - 1)) if c.n_numeric > 1 else np.nan,
+            }
+            row.update({f'p{int(q * 100)}': v for q, v in c.quantiles().items()})
+            row['Memory_MB'] = c.memory_bytes() / 1024 ** 2
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def missing_summary(self):
+        """Same output as utils.analyze_missing_values, computed from the profile."""
+        summary = self.summary()[['Column', 'Missing_Count', 'Missing_Percentage']]
+        summary = summary[summary['Missing_Count'] > 0]
+        return summary.sort_values('Missing_Percentage', ascending=False, ignore_index=True)
+
+    def memory_mb(self):
+        return sum(c.memory_bytes() for c in self.columns.values()) / 1024 ** 2
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def profile_chunks(chunks, **kwargs):
+    """
+    Profile an iterable of DataFrames in one pass (e.g. data_loader.stream_custom_query).
+
+    Args:
+        chunks: Iterable of pandas DataFrames with the same columns
+        **kwargs: DatasetProfile options (precision, sample_size, seed)
+
+    Returns:
+        DatasetProfile
+    """
+    profile = DatasetProfile(**kwargs)
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile
+
+
+def profile_dataframe(df, chunksize=DEFAULT_CHUNKSIZE, **kwargs):
+    """Profile an in-memory DataFrame chunk by chunk."""
+    return profile_chunks((df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize)), **kwargs)
+
+
+def print_profile(profile, name="Dataset"):
+    """Print the profile in the layout of utils.print_dataset_info + analyze_missing_values."""
+    print(f"\n{'='*60}")
+    print(f"{name} Profile")
+    print(f"{'='*60}")
+    print(f"Shape: {profile.rows:,} rows × {len(profile.columns)} columns ({profile.chunks} chunks)")
+    print(f"Memory usage (estimate): {profile.memory_mb():.2f} MB")
+    summary = profile.summary()
+    print(f"\nColumn types:")
+    print(summary['dtype'].value_counts())
+    print()
+    columns = ['Column', 'Missing_Percentage', 'Distinct_Estimate', 'Min', 'p50', 'Max', 'Memory_MB']
+    print(summary[columns].to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+    missing = profile.missing_summary()
+    if len(missing) > 0:
+        print(f"\n⚠️  Columns with missing values:")
+        print(missing.to_string(index=False))
+    else:
+        print("\n✅ No missing values found!")
+    print(f"\n{'='*60}\n")
+
+
+def stream_query(query, chunksize=DEFAULT_CHUNKSIZE, engine=None):
+    """Yield query results in chunks through a server-side cursor (like data_loader.stream_custom_query)."""
+    from src.pipeline import get_engine
+
+    engine = engine or get_engine()
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+        yield from pd.read_sql(query, conn, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a table or query in one streaming pass.")
+    parser.add_argument('--query', default="SELECT * FROM ml_training_dataset_mat")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+
+    profile = profile_chunks(stream_query(args.query, args.chunksize))
+    print_profile(profile, args.query)
+
+
+if __name__ == "__main__":
+    main()
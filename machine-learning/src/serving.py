@@ -0,0 +1,411 @@
+"""
+Local HTTP/JSON scoring service for the Oscar nomination model.
+
+Loads a saved artifact (src/pipeline.py) once and keeps the candidates'
+NUMERIC_FEATURES in memory, indexed by imdb_id. Endpoints:
+
+    GET  /health                       model version and table size
+    POST /score   {"imdb_ids": [...]}  probabilities for known movies
+                  {"rows": [{...}]}    or for ad-hoc feature rows
+    GET  /top-k?year=2025&k=10         most likely nominees of a year
+
+Both /score ({"explain": true}) and /top-k (&explain=1) can add each movie's top
+SHAP contributors; this is opt-in because it runs TreeSHAP on cache misses
+(src/explain.py, cached in models/<version>/shap_cache.npz).
+
+Concurrent /score requests are micro-batched into a single predict_proba call,
+and scores/rankings are cached (per model version) after the first request.
+
+Data source: ml_training_dataset_mat (Postgres, default) or a snapshot file.
+
+Usage (from machine-learning/):
+    python -m src.serving snapshot data/candidates.parquet --years 2020 2025
+    python -m src.serving serve --snapshot data/candidates.parquet --port 8765
+    curl 'localhost:8765/top-k?year=2025&k=5'
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from src.explain import DEFAULT_TOP, top_contributors
+from src.pipeline import ID_COLUMNS, NUMERIC_FEATURES, get_engine, load_artifact
+from src.text_features import ensure_text_features
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_PORT = 8765
+MAX_BATCH_ROWS = 1024
+MAX_BATCH_WAIT_MS = 2.0
+DEFAULT_TOP_K = 10
+EXPLAIN_FLAGS = {'0': False, 'false': False, '1': True, 'true': True}  # /top-k &explain= values
+
+# ============================================================================
+# FEATURE TABLE
+# ============================================================================
+
+def load_feature_table(snapshot=None, years=None, engine=None):
+    """
+    Load identifiers + NUMERIC_FEATURES indexed by imdb_id.
+
+    Args:
+        snapshot: CSV/Parquet file written by `snapshot` (database if None)
+        years: Optional (first, last) release_year range
+        engine: SQLAlchemy engine (created from .env if None)
+
+    Returns:
+        pandas.DataFrame: Feature table indexed by imdb_id
+    """
+    columns = ID_COLUMNS + NUMERIC_FEATURES
+    if snapshot:
+        snapshot = Path(snapshot)
+        if snapshot.suffix == '.parquet':
+            df = pd.read_parquet(snapshot, columns=columns)
+        else:
+            df = pd.read_csv(snapshot, usecols=columns)
+        if years:
+            df = df[df['release_year'].between(*years)]
+    else:
+        query = f"SELECT {', '.join(columns)} FROM ml_training_dataset_mat"
+        if years:
+            query += f" WHERE release_year BETWEEN {int(years[0])} AND {int(years[1])}"
+        df = pd.read_sql(query, engine or get_engine())
+    df[NUMERIC_FEATURES] = df[NUMERIC_FEATURES].astype(np.float64)
+    return df.set_index('imdb_id')
+
+
+def write_snapshot(path, years=None, engine=None):
+    """Save the feature table to CSV/Parquet so the service can run without Postgres."""
+    df = load_feature_table(years=years, engine=engine).reset_index()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return len(df)
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+class MicroBatcher:
+    """
+    Collects feature rows from concurrent requests and scores them together.
+
+    A background thread waits for the first pending request, then gathers more
+    for up to MAX_BATCH_WAIT_MS (or MAX_BATCH_ROWS rows) and runs a single
+    predict_proba on the concatenated frame.
+    """
+
+    def __init__(self, pipeline, features, max_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_BATCH_WAIT_MS):
+        self.pipeline = pipeline
+        self.features = features
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, frame):
+        """Queue a DataFrame of feature rows; returns a Future with its probabilities."""
+        future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            rows = len(pending[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_rows:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            try:
+                batch = pd.concat([frame for frame, _ in pending], ignore_index=True)
+                probs = self.pipeline.predict_proba(batch[self.features])[:, 1]
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            offset = 0
+            for frame, future in pending:
+                future.set_result(probs[offset:offset + len(frame)])
+                offset += len(frame)
+
+
+class ScoringService:
+    """Model + in-memory feature table + caches, shared by all request threads."""
+
+    def __init__(self, artifact, table):
+        self.artifact = artifact
+        self.version = artifact['metadata']['version']
+        self.threshold = artifact['optimal_threshold']
+        self.features = artifact['metadata']['features']
+        # Synopsis vectors (if the model uses them) are joined once, not per request
+        self.table = ensure_text_features(table.reset_index(), artifact['metadata']).set_index('imdb_id')
+        self.batcher = MicroBatcher(artifact['pipeline'], artifact['metadata']['features'])
+        self._scores = {}   # imdb_id -> probability (model version is fixed per process)
+        self._rankings = {}  # year -> every movie of the year, best first (at most one per year in the table)
+        self._lock = threading.Lock()
+        self._explain_lock = threading.Lock()  # the SHAP cache file is rewritten on misses
+
+    def _result(self, imdb_id, prob):
+        row = self.table.loc[imdb_id]
+        return {
+            'imdb_id': imdb_id,
+            'original_title': row['original_title'],
+            'release_year': int(row['release_year']),
+            'oscar_probability': float(prob),
+            'predicted_nominee': bool(prob >= self.threshold),
+        }
+
+    def score_ids(self, imdb_ids, explain=False):
+        """Scores for known imdb_ids (cached after the first request); unknown ids are reported apart."""
+        unknown = [i for i in imdb_ids if i not in self.table.index]
+        known = [i for i in dict.fromkeys(imdb_ids) if i in self.table.index]
+        misses = [i for i in known if i not in self._scores]
+        if misses:
+            probs = self.batcher.submit(self.table.loc[misses].reset_index()).result()
+            with self._lock:
+                self._scores.update(zip(misses, probs))
+        results = [self._result(i, self._scores[i]) for i in known]
+        return (self.explain_results(results) if explain else results), unknown
+
+    def validate_rows(self, rows):
+        """
+        Check ad-hoc rows before they reach the batcher.
+
+        Raises:
+            ValueError: If a row is not an object, has no model feature, has an
+                unknown key or a non-numeric feature value
+        """
+        allowed = set(ID_COLUMNS) | set(self.features)
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise ValueError(f"rows[{i}] must be an object")
+            unknown = sorted(set(row) - allowed)
+            if unknown:
+                raise ValueError(f"rows[{i}] has unknown keys: {', '.join(unknown)}")
+            if not any(key in self.features for key in row):
+                raise ValueError(f"rows[{i}] has none of the model features")
+            for key in self.features:
+                value = row.get(key)
+                if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                    raise ValueError(f"rows[{i}].{key} must be a number or null")
+
+    def score_rows(self, rows, explain=False):
+        """Scores for ad-hoc feature rows (missing features are imputed by the pipeline)."""
+        self.validate_rows(rows)
+        frame = pd.DataFrame(rows).reindex(columns=list(dict.fromkeys(ID_COLUMNS + self.features)))
+        frame[self.features] = frame[self.features].astype(np.float64)
+        probs = self.batcher.submit(frame).result()
+        results = [
+            {'imdb_id': row.get('imdb_id'), 'oscar_probability': float(p), 'predicted_nominee': bool(p >= self.threshold)}
+            for row, p in zip(rows, probs)
+        ]
+        if explain:
+            results = [{**r, 'contributions': c} for r, c in zip(results, self.contributions(frame))]
+        return results
+
+    def contributions(self, frame, k=DEFAULT_TOP):
+        """
+        Top-k SHAP contributors of each row of `frame`, via the artifact's SHAP cache.
+
+        Returns:
+            list: One list of {'feature', 'value', 'shap'} dicts per row, in order
+        """
+        with self._explain_lock:
+            contributors, _ = top_contributors(self.artifact, frame.reset_index(drop=True), k)
+        per_row = []
+        for row in contributors.itertuples(index=False):
+            if row.rank == 1:  # rows come movie by movie, rank 1..k
+                per_row.append([])
+            value = None if pd.isna(row.value) else float(row.value)
+            per_row[-1].append({'feature': row.feature, 'value': value, 'shap': row.shap})
+        return per_row
+
+    def explain_results(self, results):
+        """Copies of known-movie results with their 'contributions' added (cached results stay untouched)."""
+        if not results:
+            return results
+        frame = self.table.loc[[r['imdb_id'] for r in results]].reset_index()
+        return [{**r, 'contributions': c} for r, c in zip(results, self.contributions(frame))]
+
+    def ranking(self, year):
+        """
+        Every movie of `year`, most likely nominee first (cached per year).
+
+        Raises:
+            LookupError: If the table has no movie released in `year`
+        """
+        if year not in self._rankings:
+            ids = self.table.index[self.table['release_year'] == year].tolist()
+            if not ids:
+                raise LookupError(f"no movies released in {year}")
+            results, _ = self.score_ids(ids)
+            results.sort(key=lambda r: r['oscar_probability'], reverse=True)
+            with self._lock:
+                self._rankings[year] = results
+        return self._rankings[year]
+
+    def top_k(self, year, k=DEFAULT_TOP_K, explain=False):
+        """
+        The `k` most likely nominees of `year`, sliced from the cached ranking.
+
+        Raises:
+            LookupError: If the table has no movie released in `year`
+            ValueError: If k is not between 1 and the number of movies of the year
+        """
+        ranking = self.ranking(year)
+        if not 1 <= k <= len(ranking):
+            raise ValueError(f"k must be between 1 and {len(ranking)} for {year}")
+        results = self.explain_results(ranking[:k]) if explain else ranking[:k]
+        return {'year': year, 'k': k, 'model_version': self.version, 'results': results}
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    service = None  # ScoringService, set by serve()
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            return self._send(200, {
+                'status': 'ok',
+                'model_version': self.service.version,
+                'movies': len(self.service.table),
+                'batches': self.service.batcher.batches,
+            })
+        if url.path == '/top-k':
+            query = parse_qs(url.query)
+            try:
+                year = int(query['year'][0])
+                k = int(query.get('k', [DEFAULT_TOP_K])[0])
+                explain = EXPLAIN_FLAGS[query.get('explain', ['0'])[0].lower()]
+            except (KeyError, ValueError):
+                return self._send(400, {'error': 'use /top-k?year=<int>&k=<int>[&explain=1]'})
+            try:
+                return self._send(200, self.service.top_k(year, k, explain))
+            except LookupError as e:
+                return self._send(404, {'error': str(e)})
+            except ValueError as e:
+                return self._send(400, {'error': str(e)})
+            except Exception as e:
+                return self._send(500, {'error': f'scoring failed: {e}'})
+        return self._send(404, {'error': f'unknown path {url.path}'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/score':
+            return self._send(404, {'error': f'unknown path {self.path}'})
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        except json.JSONDecodeError as e:
+            return self._send(400, {'error': f'invalid JSON: {e}'})
+
+        if not isinstance(payload, dict):
+            return self._send(400, {'error': 'send {"imdb_ids": [...]} or {"rows": [...]}'})
+        explain = payload.get('explain', False)
+        if not isinstance(explain, bool):
+            return self._send(400, {'error': '"explain" must be true or false'})
+        try:
+            if 'imdb_ids' in payload:
+                ids = payload['imdb_ids']
+                if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+                    return self._send(400, {'error': '"imdb_ids" must be a non-empty list of strings'})
+                results, unknown = self.service.score_ids(ids, explain)
+                return self._send(200, {'model_version': self.service.version, 'results': results, 'unknown': unknown})
+            if 'rows' in payload:
+                rows = payload['rows']
+                if not isinstance(rows, list) or not rows:
+                    return self._send(400, {'error': '"rows" must be a non-empty list of objects'})
+                return self._send(200, {'model_version': self.service.version,
+                                        'results': self.service.score_rows(rows, explain)})
+        except ValueError as e:
+            return self._send(400, {'error': str(e)})
+        except Exception as e:
+            return self._send(500, {'error': f'scoring failed: {e}'})
+        return self._send(400, {'error': 'send {"imdb_ids": [...]} or {"rows": [...]}'})
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate the latency
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # default backlog (5) resets connections under concurrent dashboards
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT, snapshot=None, years=None, version=None):
+    """Load the artifact and feature table, then answer requests until interrupted."""
+    start = time.perf_counter()
+    artifact = load_artifact(version)
+    table = load_feature_table(snapshot, years)
+    ScoringHandler.service = ScoringService(artifact, table)
+    server = ScoringServer((host, port), ScoringHandler)
+    print(f"✅ Model {artifact['metadata']['version']} and {len(table)} movies loaded in "
+          f"{time.perf_counter() - start:.1f}s ({'snapshot ' + str(snapshot) if snapshot else 'Postgres'})")
+    print(f"🌐 Serving on http://{host}:{port} (/score, /top-k?year=, /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local scoring service for the Oscar model.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help='Start the HTTP service')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--snapshot', type=Path, default=None, help='CSV/Parquet feature snapshot (default: Postgres)')
+    serve_parser.add_argument('--years', type=int, nargs=2, default=None, metavar=('FIRST', 'LAST'))
+    serve_parser.add_argument('--version', default=None, help='Model version (default: LATEST)')
+
+    snapshot_parser = sub.add_parser('snapshot', help='Export the feature table from Postgres')
+    snapshot_parser.add_argument('output', type=Path)
+    snapshot_parser.add_argument('--years', type=int, nargs=2, default=None, metavar=('FIRST', 'LAST'))
+    args = parser.parse_args()
+
+    if args.command == 'snapshot':
+        rows = write_snapshot(args.output, args.years)
+        print(f"💾 {rows} movies saved to {args.output}")
+        return
+    serve(args.host, args.port, args.snapshot, args.years, args.version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Precomputed synopsis text features.
+
+movies.synopsis is turned into a fixed-width vector once per movie and stored,
+so training and scoring only join ready-made float32 columns:
+- synopses are hashed into word 1-2 gram counts (HashingVectorizer: no
+  vocabulary to fit, a movie's vector never depends on the other movies)
+- a TruncatedSVD fitted once on the training years (2000-2019, same as
+  ml_split_train) projects them to N_COMPONENTS dense components
+- vectors are kept in models/text_features/synopsis.npz keyed by imdb_id and
+  the MD5 of the synopsis; `update` only vectorizes movies that are new or
+  whose synopsis changed
+
+The store records a fingerprint of the projection that produced it, and models
+trained with text features save that fingerprint in their metadata; scoring
+refuses a store built by another projection (e.g. after `update --refit`)
+instead of silently feeding different components to an older model.
+
+Usage (from machine-learning/):
+    python -m src.text_features update
+    python -m src.text_features update --input ../data_base_construction/data/raw/movies_catalog_oscar_and_popular_2000_2025.csv
+    python -m src.pipeline train --text-features
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.pipeline import MODELS_DIR, get_engine
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TEXT_DIR = MODELS_DIR / "text_features"
+STORE_FILE = "synopsis.npz"
+PROJECTION_FILE = "synopsis_svd.joblib"
+
+N_HASH_FEATURES = 2 ** 16  # ~3k short synopses: few collisions, small projection file
+NGRAM_RANGE = (1, 2)
+N_COMPONENTS = 32
+FIT_YEARS = (2000, 2019)
+
+TEXT_FEATURES = [f'synopsis_svd_{i:02d}' for i in range(N_COMPONENTS)]
+
+# Raw catalog columns (data_base_construction/data/raw) -> movies columns
+CSV_COLUMNS = {'ID IMDb': 'imdb_id', 'Ano Lançamento': 'release_year', 'Sinopse': 'synopsis'}
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+def synopsis_digest(synopsis):
+    """MD5 of a synopsis (same value as md5(COALESCE(synopsis, '')) in Postgres)."""
+    return hashlib.md5(synopsis.encode('utf-8')).hexdigest()
+
+
+def load_synopses(known=None, input_path=None, engine=None):
+    """
+    Load the synopses that are not in the store or changed since they were vectorized.
+
+    Args:
+        known: {imdb_id: synopsis MD5} already in the store
+        input_path: Raw catalog CSV (columns 'ID IMDb', 'Ano Lançamento', 'Sinopse');
+            database if None
+        engine: SQLAlchemy engine (created from .env if None)
+
+    Returns:
+        pandas.DataFrame: imdb_id, release_year, synopsis and digest of each new/changed movie
+    """
+    known = known or {}
+    if input_path:
+        df = pd.read_csv(input_path, usecols=list(CSV_COLUMNS)).rename(columns=CSV_COLUMNS)
+        df = df.drop_duplicates('imdb_id')
+        df['synopsis'] = df['synopsis'].fillna('').astype(str)
+        df['digest'] = df['synopsis'].map(synopsis_digest)
+        df = df[df['digest'] != df['imdb_id'].map(known)]
+        return df.reset_index(drop=True)
+
+    from sqlalchemy import text
+
+    engine = engine or get_engine()
+    # Only digests travel for unchanged movies; full texts are fetched for the rest
+    digests = pd.read_sql("SELECT imdb_id, md5(COALESCE(synopsis, '')) AS digest FROM movies", engine)
+    stale = digests[digests['digest'] != digests['imdb_id'].map(known)]
+    query = text("SELECT imdb_id, release_year, COALESCE(synopsis, '') AS synopsis "
+                 "FROM movies WHERE imdb_id = ANY(:ids)")
+    df = pd.read_sql(query, engine, params={'ids': stale['imdb_id'].tolist()})
+    return df.merge(stale, on='imdb_id')
+
+# ============================================================================
+# PROJECTION
+# ============================================================================
+
+def get_projection(n_components=N_COMPONENTS):
+    """
+    Unfitted hashing + TruncatedSVD pipeline (texts -> n_components floats).
+
+    Returns:
+        sklearn.pipeline.Pipeline
+    """
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline(steps=[
+        ('hashing', HashingVectorizer(
+            n_features=N_HASH_FEATURES, ngram_range=NGRAM_RANGE, stop_words='english',
+            alternate_sign=False, norm='l2', dtype=np.float32,
+        )),
+        ('svd', TruncatedSVD(n_components=n_components, random_state=42)),
+    ])
+
+
+def fit_projection(synopses, fit_years=FIT_YEARS, n_components=N_COMPONENTS):
+    """Fit the projection on the synopses released in `fit_years` (inclusive range)."""
+    # Sorted so the (randomized) SVD does not depend on the row order of the source
+    corpus = synopses[synopses['release_year'].between(*fit_years)].sort_values('imdb_id')
+    if corpus.empty:
+        raise ValueError(f"No synopses between {fit_years[0]} and {fit_years[1]} to fit the projection")
+    projection = get_projection(n_components).fit(corpus['synopsis'])
+    svd = projection.named_steps['svd']
+    svd.components_ = svd.components_.astype(np.float32)
+    return projection
+
+
+def projection_fingerprint(projection):
+    """Short SHA-256 of the hashing parameters and SVD components."""
+    digest = hashlib.sha256(repr(sorted(projection.named_steps['hashing'].get_params().items())).encode())
+    digest.update(np.ascontiguousarray(projection.named_steps['svd'].components_).tobytes())
+    return digest.hexdigest()[:16]
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class TextFeatureStore:
+    """float32 synopsis vectors keyed by imdb_id + synopsis MD5 (models/text_features/synopsis.npz)."""
+
+    def __init__(self, directory=TEXT_DIR):
+        self.path = Path(directory) / STORE_FILE
+        self.ids = np.empty(0, dtype=str)
+        self.digests = np.empty(0, dtype=str)
+        self.values = np.empty((0, N_COMPONENTS), dtype=np.float32)
+        self.projection = None
+        if self.path.exists():
+            with np.load(self.path) as data:
+                if 'digests' in data.files:  # stores without digests are rebuilt by `update`
+                    self.ids, self.digests, self.values = data['ids'], data['digests'], data['values']
+                    self.projection = str(data['projection'])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def known(self):
+        """{imdb_id: synopsis MD5} of the stored vectors."""
+        return dict(zip(self.ids.tolist(), self.digests.tolist()))
+
+    def add(self, ids, digests, values, projection):
+        """Insert or replace movies and rewrite the store file atomically."""
+        if self.projection not in (None, projection):
+            raise ValueError(f"Store built by projection {self.projection}, not {projection}")
+        ids = np.asarray(ids, dtype=str)
+        keep = ~np.isin(self.ids, ids)
+        self.ids = np.concatenate([self.ids[keep], ids])
+        self.digests = np.concatenate([self.digests[keep], np.asarray(digests, dtype=str)])
+        self.values = np.vstack([self.values[keep], np.asarray(values, dtype=np.float32)])
+        self.projection = projection
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_name(self.path.name + '.tmp.npz')
+        np.savez(temp_file, ids=self.ids, digests=self.digests, values=self.values,
+                 projection=np.array(projection))
+        os.replace(temp_file, self.path)
+
+    def frame(self):
+        """Stored vectors as a DataFrame: imdb_id + TEXT_FEATURES."""
+        df = pd.DataFrame(self.values, columns=TEXT_FEATURES[:self.values.shape[1]])
+        df.insert(0, 'imdb_id', self.ids.astype(object))
+        return df
+
+
+def update_text_features(input_path=None, engine=None, directory=TEXT_DIR, refit=False):
+    """
+    Vectorize the synopses that are new or changed since the last update.
+
+    The projection is fitted (on FIT_YEARS) only when it does not exist or
+    `refit` is set; in both cases the store is rebuilt from scratch.
+
+    Args:
+        input_path: Raw catalog CSV instead of the database
+        engine: SQLAlchemy engine (created from .env if None)
+        directory: Where the store and projection live
+        refit: Refit the projection and recompute every movie
+
+    Returns:
+        dict: vectorized movies, stored movies, projection fingerprint and
+        whether the projection was fitted
+    """
+    directory = Path(directory)
+    projection_path = directory / PROJECTION_FILE
+    fitted = refit or not projection_path.exists()
+    if fitted:
+        (directory / STORE_FILE).unlink(missing_ok=True)
+
+    store = TextFeatureStore(directory)
+    synopses = load_synopses(store.known(), input_path, engine)
+    projection = None
+    if fitted:
+        projection = fit_projection(synopses)
+        directory.mkdir(parents=True, exist_ok=True)
+        joblib.dump(projection, projection_path)
+    elif len(synopses):
+        projection = joblib.load(projection_path)
+
+    if projection is not None:
+        fingerprint = projection_fingerprint(projection)
+        if store.projection not in (None, fingerprint):
+            # Projection file replaced under an existing store: recompute everything
+            (directory / STORE_FILE).unlink(missing_ok=True)
+            store = TextFeatureStore(directory)
+            synopses = load_synopses(None, input_path, engine)
+        if len(synopses):
+            store.add(synopses['imdb_id'], synopses['digest'],
+                      projection.transform(synopses['synopsis']), fingerprint)
+    return {'new': len(synopses), 'stored': len(store), 'projection': store.projection, 'fitted': fitted}
+
+
+def join_text_features(df, projection=None, directory=TEXT_DIR):
+    """
+    Left-join the stored synopsis vectors on imdb_id.
+
+    Movies without a stored vector get NaN (imputed by the model pipeline);
+    run `python -m src.text_features update` after loading new movies.
+
+    Args:
+        df: DataFrame with imdb_id
+        projection: Fingerprint the store must have been built with (any if None)
+        directory: Where the store lives
+
+    Returns:
+        pandas.DataFrame: df plus TEXT_FEATURES
+
+    Raises:
+        FileNotFoundError: If the store is empty
+        ValueError: If the store was built by another projection
+    """
+    store = TextFeatureStore(directory)
+    if not len(store):
+        raise FileNotFoundError(f"No text features in {store.path} (run: python -m src.text_features update)")
+    if projection is not None and store.projection != projection:
+        raise ValueError(f"Text features in {store.path} come from projection {store.projection}, "
+                         f"but the model was trained with {projection}; retrain the model "
+                         f"(python -m src.pipeline train --text-features)")
+    text = store.frame()
+    return df.drop(columns=[col for col in text.columns[1:] if col in df.columns]).merge(text, on='imdb_id', how='left')
+
+
+def ensure_text_features(df, metadata, directory=TEXT_DIR):
+    """
+    Join the text features only if the model uses them and `df` does not have them yet.
+
+    Args:
+        df: Candidate rows
+        metadata: Artifact metadata ('features' and, for text models, 'text_projection')
+        directory: Where the store lives
+    """
+    if any(col in TEXT_FEATURES and col not in df.columns for col in metadata['features']):
+        return join_text_features(df, metadata.get('text_projection'), directory)
+    return df
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute synopsis text features.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    update_parser = sub.add_parser('update', help='Vectorize new or changed synopses')
+    update_parser.add_argument('--input', type=Path, default=None, help='Raw catalog CSV (default: Postgres)')
+    update_parser.add_argument('--directory', type=Path, default=TEXT_DIR)
+    update_parser.add_argument('--refit', action='store_true', help='Refit the SVD and rebuild the store')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = update_text_features(args.input, directory=args.directory, refit=args.refit)
+    elapsed_ms = 1000 * (time.perf_counter() - start)
+    fitted = f" (SVD fitted on {FIT_YEARS[0]}-{FIT_YEARS[1]})" if result['fitted'] else ""
+    print(f"✅ {result['new']} new/changed synopses vectorized{fitted} in {elapsed_ms:.0f} ms; "
+          f"{result['stored']} movies in {args.directory / STORE_FILE} (projection {result['projection']})")
+
+
+if __name__ == "__main__":
+    main()
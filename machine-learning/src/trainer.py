@@ -0,0 +1,241 @@
+"""
+Concurrent training of the model comparison from notebooks 02-03.
+
+Logistic Regression, Random Forest, XGBoost and CatBoost are fitted at the same
+time, one process each, instead of one after another with every library
+grabbing all cores:
+- X/y for train and validation are published once in shared memory
+  (SharedArrays from src.tuning); workers read them without copies.
+- Each model gets an explicit thread budget (library n_jobs/thread_count plus
+  threadpoolctl for BLAS/OpenMP), so the budgets add up to the CPU count. With
+  fewer cores than models, each model gets one thread and only as many models
+  as cores run at a time; the rest wait for a free slot.
+- Optionally, the validation probabilities are averaged into a soft-voting ensemble.
+
+Usage (from machine-learning/):
+    python -m src.trainer
+    python -m src.trainer --models lr rf catboost --ensemble
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline import NUMERIC_FEATURES, TARGET, load_splits, recall_threshold
+from src.tuning import SharedArrays
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MODELS = ['lr', 'rf', 'xgboost', 'catboost']
+
+# Relative share of the cores; Logistic Regression barely uses more than one
+THREAD_WEIGHTS = {'lr': 0, 'rf': 1, 'xgboost': 1, 'catboost': 1}
+
+
+def concurrent_slots(models, n_cores=None):
+    """Models fitted at the same time: one per core at most."""
+    return max(1, min(len(models), n_cores or os.cpu_count() or 1))
+
+
+def allocate_threads(models, n_cores=None):
+    """
+    Split the cores between models by THREAD_WEIGHTS, one thread at least each.
+
+    Every model starts with one thread; when there are more cores than models,
+    the spare cores go to the weighted models in proportion to their weight
+    (largest remainder), so the budgets add up to exactly `n_cores`. With fewer
+    cores than models every budget is 1 and train_models runs only
+    concurrent_slots() models at a time, so the total never exceeds `n_cores`.
+
+    Args:
+        models: Model names
+        n_cores: Cores available (default: os.cpu_count())
+
+    Returns:
+        dict: model name -> thread budget
+    """
+    n_cores = n_cores or os.cpu_count() or 1
+    budget = {m: 1 for m in models}
+    weighted = [m for m in models if THREAD_WEIGHTS[m] > 0]
+    spare = n_cores - len(models)
+    if spare <= 0 or not weighted:
+        return budget
+    total_weight = sum(THREAD_WEIGHTS[m] for m in weighted)
+    shares = {m: spare * THREAD_WEIGHTS[m] / total_weight for m in weighted}
+    for m in weighted:
+        budget[m] += int(shares[m])
+    leftover = spare - sum(int(share) for share in shares.values())
+    for m in sorted(weighted, key=lambda m: shares[m] - int(shares[m]), reverse=True)[:leftover]:
+        budget[m] += 1
+    return budget
+
+
+def get_classifier(name, threads, y_train):
+    """Classifiers with the notebook 02/03 settings and an explicit thread count."""
+    if name == 'lr':
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(class_weight='balanced', random_state=42, max_iter=1000)
+    if name == 'rf':
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_estimators=200, class_weight='balanced', random_state=42, n_jobs=threads)
+    if name == 'xgboost':
+        from xgboost import XGBClassifier
+        scale_weight = (y_train == 0).sum() / (y_train == 1).sum()
+        return XGBClassifier(n_estimators=200, learning_rate=0.05, max_depth=4, scale_pos_weight=scale_weight,
+                             random_state=42, n_jobs=threads, eval_metric='auc')
+    if name == 'catboost':
+        from catboost import CatBoostClassifier
+        return CatBoostClassifier(iterations=500, learning_rate=0.05, depth=6, auto_class_weights='Balanced',
+                                  verbose=0, random_state=42, thread_count=threads, allow_writing_files=False)
+    raise ValueError(f"Unknown model: {name}")
+
+# ============================================================================
+# WORKERS
+# ============================================================================
+
+_SHARED = None
+
+
+def _init_worker(layout):
+    global _SHARED
+    _SHARED = SharedArrays.attach(layout)
+
+
+def fit_model(name, threads):
+    """
+    Fit one model on the shared training matrix (runs inside a pool worker).
+
+    Returns:
+        dict: name, fitted pipeline, validation probabilities, ROC-AUC and timings
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.metrics import roc_auc_score
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from threadpoolctl import threadpool_limits
+
+    X_train = pd.DataFrame(_SHARED['X_train'], columns=NUMERIC_FEATURES, copy=False)
+    X_val = pd.DataFrame(_SHARED['X_val'], columns=NUMERIC_FEATURES, copy=False)
+    y_train = _SHARED['y_train']
+
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler())
+    ])
+    preprocessor = ColumnTransformer(transformers=[('num', numeric_transformer, NUMERIC_FEATURES)])
+    pipeline = Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('classifier', get_classifier(name, threads, y_train))
+    ])
+
+    start = time.perf_counter()
+    with threadpool_limits(limits=threads):
+        pipeline.fit(X_train, y_train)
+        y_prob = pipeline.predict_proba(X_val)[:, 1]
+    return {
+        'name': name,
+        'threads': threads,
+        'pipeline': pipeline,
+        'y_prob': y_prob,
+        'roc_auc': float(roc_auc_score(_SHARED['y_val'], y_prob)),
+        'seconds': time.perf_counter() - start,
+    }
+
+# ============================================================================
+# TRAINER
+# ============================================================================
+
+def train_models(models=MODELS, n_cores=None, engine=None, splits=None):
+    """
+    Fit `models` concurrently on ml_split_train and score them on ml_split_validation.
+
+    Args:
+        models: Model names (subset of MODELS)
+        n_cores: Cores to split between the models (default: all); with fewer
+            cores than models, the surplus models run after the first ones finish
+        engine: SQLAlchemy engine (created from .env if None)
+        splits: Preloaded {'train': df, 'validation': df} (loaded from the views if None)
+
+    Returns:
+        tuple: (dict of model name -> result, validation labels, wall-clock seconds)
+    """
+    splits = splits or load_splits(engine, names=('train', 'validation'))
+    arrays = {
+        'X_train': splits['train'][NUMERIC_FEATURES].to_numpy(dtype=np.float64),
+        'y_train': splits['train'][TARGET].to_numpy(dtype=np.int8),
+        'X_val': splits['validation'][NUMERIC_FEATURES].to_numpy(dtype=np.float64),
+        'y_val': splits['validation'][TARGET].to_numpy(dtype=np.int8),
+    }
+    budget = allocate_threads(models, n_cores)
+    # Heaviest models first, so those waiting for a slot are the cheap ones
+    order = sorted(models, key=lambda m: THREAD_WEIGHTS[m], reverse=True)
+    results = {}
+
+    shared = SharedArrays(arrays)
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=concurrent_slots(models, n_cores), mp_context=get_context('spawn'),
+                                 initializer=_init_worker, initargs=(shared.layout,)) as executor:
+            futures = [executor.submit(fit_model, name, budget[name]) for name in order]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result['name']] = result
+                print(f"   ✅ {result['name']:<9} ROC-AUC {result['roc_auc']:.4f}  "
+                      f"{result['seconds']:.1f}s on {result['threads']} thread(s)")
+    finally:
+        shared.close()
+    return results, arrays['y_val'], time.perf_counter() - start
+
+
+def soft_vote(results, y_val, members=None, weights=None):
+    """
+    Soft-voting ensemble: weighted mean of the members' validation probabilities.
+
+    Returns:
+        dict: members, probabilities, ROC-AUC and the recall-0.90 threshold
+    """
+    from sklearn.metrics import roc_auc_score
+
+    members = members or list(results)
+    y_prob = np.average([results[m]['y_prob'] for m in members], axis=0, weights=weights)
+    return {
+        'members': members,
+        'y_prob': y_prob,
+        'roc_auc': float(roc_auc_score(y_val, y_prob)),
+        'optimal_threshold': recall_threshold(y_val, y_prob),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the model comparison concurrently.")
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=MODELS)
+    parser.add_argument('--cores', type=int, default=None, help='Cores to split between models (default: all)')
+    parser.add_argument('--ensemble', action='store_true', help='Also evaluate a soft-voting ensemble')
+    args = parser.parse_args()
+
+    budget = allocate_threads(args.models, args.cores)
+    slots = concurrent_slots(args.models, args.cores)
+    print(f"🚀 Training {', '.join(args.models)} concurrently (threads: {budget}, {slots} at a time)")
+    results, y_val, wall = train_models(args.models, args.cores)
+
+    slowest = max(results.values(), key=lambda r: r['seconds'])
+    serial = sum(r['seconds'] for r in results.values())
+    print(f"\n⏱️  Wall time {wall:.1f}s | slowest model {slowest['name']} {slowest['seconds']:.1f}s | "
+          f"sum of fits {serial:.1f}s")
+
+    if args.ensemble:
+        ensemble = soft_vote(results, y_val)
+        print(f"🗳️  Soft voting ({', '.join(ensemble['members'])}): ROC-AUC {ensemble['roc_auc']:.4f}, "
+              f"threshold (recall ~90%) {ensemble['optimal_threshold']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+Parallel hyperparameter search with expanding-window temporal cross-validation.
+
+Replaces the hand tuning of notebooks 03/04 (one fixed 2020-2022 split, one
+serial fit per configuration):
+- Folds by release_year, always training on past years only (same leakage-safe
+  rule as the ml_split_* views); 2023-2024 stays out as the holdout test.
+- Folds are preprocessed once and published in shared memory; pool workers
+  attach to them instead of receiving pickled copies.
+- Configurations run across a process pool with early stopping on an inner
+  holdout (the last training years of each fold), so the validation years are
+  only used for scoring; a trial is pruned as soon as its running AUC falls
+  below the median of finished trials.
+- Every trial is appended to a JSONL log; rerunning with the same --study
+  resumes where it stopped. The log starts with a header (model, seed, fold
+  layout, search space) and a rerun with different settings is refused.
+
+Usage (from machine-learning/):
+    python -m src.tuning --trials 200 --n-jobs 4
+    python -m src.tuning --model xgboost --study xgb_search --trials 100
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context, shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline import MODELS_DIR, NUMERIC_FEATURES, TARGET, get_engine
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TUNING_DIR = MODELS_DIR / "tuning"
+
+FIRST_YEAR = 2000
+HOLDOUT_START = 2023        # 2023-2024 = ml_split_test, never seen by the search
+VALIDATION_YEARS = 3        # same width as ml_split_validation (2020-2022)
+N_FOLDS = 3                 # validation blocks 2014-2016, 2017-2019, 2020-2022
+
+MAX_ITERATIONS = 2000
+EARLY_STOPPING_ROUNDS = 100
+EARLY_STOPPING_YEARS = 2    # last training years of each fold, used only to stop boosting
+MIN_TRIALS_FOR_PRUNING = 8
+
+# Search spaces: (kind, low, high); 'log' samples uniformly in log scale
+SEARCH_SPACES = {
+    'catboost': {
+        'learning_rate': ('log', 0.01, 0.2),
+        'depth': ('int', 3, 8),
+        'l2_leaf_reg': ('log', 1.0, 30.0),
+        'random_strength': ('log', 0.1, 10.0),
+        'bagging_temperature': ('float', 0.0, 1.0),
+    },
+    'xgboost': {
+        'learning_rate': ('log', 0.01, 0.2),
+        'max_depth': ('int', 2, 8),
+        'min_child_weight': ('log', 0.5, 20.0),
+        'subsample': ('float', 0.5, 1.0),
+        'colsample_bytree': ('float', 0.5, 1.0),
+        'reg_lambda': ('log', 0.1, 30.0),
+    },
+}
+
+# ============================================================================
+# FOLDS
+# ============================================================================
+
+def expanding_year_folds(years, n_folds=N_FOLDS, val_years=VALIDATION_YEARS, holdout_start=HOLDOUT_START):
+    """
+    Expanding-window folds: each fold validates on `val_years` consecutive years
+    and trains on every earlier year. The last block ends right before the holdout.
+
+    Args:
+        years: Array of release years (one per row)
+        n_folds: Number of validation blocks
+        val_years: Width of each validation block in years
+        holdout_start: First year kept out of the search
+
+    Returns:
+        list: (train_years, validation_years) tuples, oldest fold first
+    """
+    available = sorted(set(int(y) for y in years if y < holdout_start))
+    folds = []
+    for k in range(n_folds, 0, -1):
+        val_start = holdout_start - k * val_years
+        train_years = [y for y in available if y < val_start]
+        val_block = [y for y in available if val_start <= y < val_start + val_years]
+        if train_years and val_block:
+            folds.append((train_years, val_block))
+    return folds
+
+
+def load_search_data(engine=None):
+    """
+    Load the labelled years used by the search (2000 up to the holdout).
+
+    Returns:
+        pandas.DataFrame: Rows of ml_training_dataset_mat with features, label and release_year
+    """
+    engine = engine or get_engine()
+    columns = ', '.join(['release_year'] + NUMERIC_FEATURES + [TARGET])
+    query = (f"SELECT {columns} FROM ml_training_dataset_mat "
+             f"WHERE release_year >= {FIRST_YEAR} AND release_year < {HOLDOUT_START}")
+    return pd.read_sql(query, engine)
+
+
+def build_folds(df, folds, stop_years=EARLY_STOPPING_YEARS):
+    """
+    Preprocess every fold once, like the notebook pipeline (median imputation +
+    StandardScaler). The last `stop_years` training years become the fold's
+    early-stopping set; the model and transformer are fit on the years before.
+
+    Returns:
+        dict: array name -> numpy array (fold{k}_X_train, fold{k}_X_stop, fold{k}_X_val, ...)
+    """
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    arrays = {}
+    for k, (train_years, val_years) in enumerate(folds):
+        fit_years, early_years = train_years[:-stop_years], train_years[-stop_years:]
+        train_df = df[df['release_year'].isin(fit_years)]
+        stop_df = df[df['release_year'].isin(early_years)]
+        val_df = df[df['release_year'].isin(val_years)]
+        transformer = Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='median')),
+            ('scaler', StandardScaler())
+        ])
+        arrays[f'fold{k}_X_train'] = transformer.fit_transform(train_df[NUMERIC_FEATURES]).astype(np.float32)
+        arrays[f'fold{k}_y_train'] = train_df[TARGET].to_numpy(dtype=np.int8)
+        arrays[f'fold{k}_X_stop'] = transformer.transform(stop_df[NUMERIC_FEATURES]).astype(np.float32)
+        arrays[f'fold{k}_y_stop'] = stop_df[TARGET].to_numpy(dtype=np.int8)
+        arrays[f'fold{k}_X_val'] = transformer.transform(val_df[NUMERIC_FEATURES]).astype(np.float32)
+        arrays[f'fold{k}_y_val'] = val_df[TARGET].to_numpy(dtype=np.int8)
+    return arrays
+
+# ============================================================================
+# SHARED MEMORY
+# ============================================================================
+
+class SharedArrays:
+    """
+    A set of numpy arrays packed into one multiprocessing.shared_memory block.
+
+    The owner creates it from a dict of arrays and passes `layout` to the
+    workers, which call SharedArrays.attach(layout) and read the arrays without
+    copying. The owner releases the block with close().
+    """
+
+    def __init__(self, arrays):
+        self.layout = {'name': None, 'arrays': {}}
+        offset = 0
+        for key, array in arrays.items():
+            offset = -(-offset // 64) * 64  # 64-byte alignment
+            self.layout['arrays'][key] = (offset, array.shape, array.dtype.str)
+            offset += array.nbytes
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.layout['name'] = self._shm.name
+        self.arrays = self._views(self._shm, self.layout)
+        for key, array in arrays.items():
+            self.arrays[key][...] = array
+        self._owner = True
+
+    @staticmethod
+    def _views(shm, layout):
+        return {
+            key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for key, (offset, shape, dtype) in layout['arrays'].items()
+        }
+
+    @classmethod
+    def attach(cls, layout):
+        """Open an existing block from its layout (worker side)."""
+        self = cls.__new__(cls)
+        self.layout = layout
+        self._shm = shared_memory.SharedMemory(name=layout['name'])
+        self.arrays = cls._views(self._shm, layout)
+        self._owner = False
+        return self
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self):
+        self.arrays = {}
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+_SHARED = None  # worker-side handle, set by _init_worker
+
+
+def _init_worker(layout):
+    global _SHARED
+    _SHARED = SharedArrays.attach(layout)
+
+# ============================================================================
+# TRIALS
+# ============================================================================
+
+def sample_params(model_kind, trial_number, seed):
+    """
+    Draw one configuration. Seeded by trial number, so a resumed study draws the
+    same configurations it would have drawn in a single run.
+    """
+    rng = random.Random(seed * 1_000_003 + trial_number)
+    params = {}
+    for name, (kind, low, high) in SEARCH_SPACES[model_kind].items():
+        if kind == 'int':
+            params[name] = rng.randint(low, high)
+        elif kind == 'log':
+            params[name] = round(math.exp(rng.uniform(math.log(low), math.log(high))), 6)
+        else:
+            params[name] = round(rng.uniform(low, high), 6)
+    return params
+
+
+def _fit_fold(model_kind, params, X_train, y_train, X_stop, y_stop, X_val, threads):
+    """
+    Fit one fold with early stopping on its inner holdout (X_stop/y_stop) and
+    return (validation probabilities, best iteration).
+    """
+    if model_kind == 'catboost':
+        from catboost import CatBoostClassifier
+
+        model = CatBoostClassifier(
+            iterations=MAX_ITERATIONS, auto_class_weights='Balanced', eval_metric='AUC',
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS, thread_count=threads,
+            random_state=42, verbose=0, allow_writing_files=False, **params
+        )
+        model.fit(X_train, y_train, eval_set=(X_stop, y_stop), use_best_model=True)
+        return model.predict_proba(X_val)[:, 1], int(model.get_best_iteration())
+
+    from xgboost import XGBClassifier
+
+    model = XGBClassifier(
+        n_estimators=MAX_ITERATIONS, scale_pos_weight=(y_train == 0).sum() / max((y_train == 1).sum(), 1),
+        eval_metric='auc', early_stopping_rounds=EARLY_STOPPING_ROUNDS, n_jobs=threads,
+        random_state=42, **params
+    )
+    model.fit(X_train, y_train, eval_set=[(X_stop, y_stop)], verbose=False)
+    return model.predict_proba(X_val, iteration_range=(0, model.best_iteration + 1))[:, 1], int(model.best_iteration)
+
+
+def run_trial(trial_number, model_kind, params, n_folds, prune_below, threads):
+    """
+    Evaluate one configuration on the shared folds (runs inside a pool worker).
+
+    Args:
+        trial_number: Position of the trial in the study
+        model_kind: 'catboost' or 'xgboost'
+        params: Sampled hyperparameters
+        n_folds: Number of folds in shared memory
+        prune_below: Per-fold minimum running mean AUC (median of finished trials), or None
+        threads: Threads given to the model library
+
+    Returns:
+        dict: Trial record for the log
+    """
+    from sklearn.metrics import roc_auc_score
+
+    start = time.perf_counter()
+    fold_auc, best_iterations = [], []
+    state = 'complete'
+    for k in range(n_folds):
+        y_val = _SHARED[f'fold{k}_y_val']
+        y_prob, best_iteration = _fit_fold(
+            model_kind, params,
+            _SHARED[f'fold{k}_X_train'], _SHARED[f'fold{k}_y_train'],
+            _SHARED[f'fold{k}_X_stop'], _SHARED[f'fold{k}_y_stop'],
+            _SHARED[f'fold{k}_X_val'], threads
+        )
+        fold_auc.append(float(roc_auc_score(y_val, y_prob)))
+        best_iterations.append(best_iteration)
+        if prune_below is not None and k < n_folds - 1 and np.mean(fold_auc) < prune_below[k]:
+            state = 'pruned'
+            break
+
+    return {
+        'trial': trial_number,
+        'model': model_kind,
+        'params': params,
+        'state': state,
+        'fold_auc': fold_auc,
+        'mean_auc': float(np.mean(fold_auc)),
+        'best_iterations': best_iterations,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def prune_thresholds(trials, n_folds):
+    """Median running mean AUC per fold over the completed trials (None until there are enough)."""
+    completed = [t for t in trials if t['state'] == 'complete']
+    if len(completed) < MIN_TRIALS_FOR_PRUNING:
+        return None
+    return [float(np.median([np.mean(t['fold_auc'][:k + 1]) for t in completed])) for k in range(n_folds)]
+
+# ============================================================================
+# STUDY
+# ============================================================================
+
+def study_header(model_kind, seed):
+    """
+    First record of a study log: everything that makes trial numbers comparable.
+
+    Trial n of a study always samples the same configuration (sample_params) and
+    is scored on the same folds, so a log can only be resumed with the same values.
+    """
+    header = {
+        'header': True,
+        'model': model_kind,
+        'seed': seed,
+        'folds': {
+            'first_year': FIRST_YEAR,
+            'holdout_start': HOLDOUT_START,
+            'validation_years': VALIDATION_YEARS,
+            'n_folds': N_FOLDS,
+            'early_stopping_years': EARLY_STOPPING_YEARS,
+        },
+        'search_space': SEARCH_SPACES[model_kind],
+    }
+    return json.loads(json.dumps(header))  # tuples -> lists, as read back from the log
+
+
+def read_trial_log(path):
+    """
+    Header and trials recorded in a study log.
+
+    Returns:
+        tuple: (header dict or None, list of trial records); (None, []) if the log does not exist
+    """
+    path = Path(path)
+    if not path.exists():
+        return None, []
+    with open(path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    header = next((r for r in records if r.get('header')), None)
+    return header, [r for r in records if not r.get('header')]
+
+
+def check_resume(study, header, logged_header, trials):
+    """
+    Refuse to resume a study logged with other settings.
+
+    Raises:
+        ValueError: If the log has trials but no header, or a header that differs from `header`
+    """
+    if logged_header is None:
+        if trials:
+            raise ValueError(f"Study {study} has {len(trials)} trials but no header (logged before headers "
+                             f"were written); use a new --study name")
+        return
+    changed = [key for key in header if logged_header.get(key) != header[key]]
+    if changed:
+        details = ', '.join(f"{key}: {logged_header.get(key)} -> {header[key]}" if key != 'search_space'
+                            else "search_space changed" for key in changed)
+        raise ValueError(f"Study {study} was run with other settings ({details}); "
+                         f"use a new --study name or the original settings")
+
+
+def run_study(study, model_kind='catboost', n_trials=100, n_jobs=None, seed=42, engine=None):
+    """
+    Run (or resume) a study until it holds `n_trials` trials.
+
+    Args:
+        study: Study name; trials are logged to TUNING_DIR/<study>.jsonl
+        model_kind: 'catboost' or 'xgboost'
+        n_trials: Total number of trials in the study
+        n_jobs: Worker processes (default: all cores)
+        seed: Seed of the configuration sampler
+        engine: SQLAlchemy engine (created from .env if None)
+
+    Returns:
+        list: All trial records of the study
+
+    Raises:
+        ValueError: If the study log was written with another model, seed, fold
+            layout or search space
+    """
+    log_path = TUNING_DIR / f"{study}.jsonl"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    header = study_header(model_kind, seed)
+    logged_header, trials = read_trial_log(log_path)
+    check_resume(study, header, logged_header, trials)
+    if logged_header is None:
+        with open(log_path, 'a', encoding='utf-8') as log:
+            log.write(json.dumps(header) + '\n')
+    done = {t['trial'] for t in trials}
+    pending = [n for n in range(n_trials) if n not in done]
+    if trials:
+        print(f"↩️  Resuming {study}: {len(trials)} trials logged, {len(pending)} to go")
+    if not pending:
+        return trials
+
+    df = load_search_data(engine)
+    folds = expanding_year_folds(df['release_year'])
+    for k, (train_years, val_years) in enumerate(folds):
+        stop_start = train_years[-EARLY_STOPPING_YEARS]
+        print(f"   Fold {k}: train {train_years[0]}-{stop_start - 1} | early stopping {stop_start}-{train_years[-1]} "
+              f"| validation {val_years[0]}-{val_years[-1]}")
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // n_jobs)
+    shared = SharedArrays(build_folds(df, folds))
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=get_context('spawn'),
+                                 initializer=_init_worker, initargs=(shared.layout,)) as executor, \
+                open(log_path, 'a', encoding='utf-8') as log:
+            running = set()
+            queue = iter(pending)
+            while True:
+                # Keep the pool full; thresholds are taken from the trials finished so far
+                while len(running) < n_jobs:
+                    trial_number = next(queue, None)
+                    if trial_number is None:
+                        break
+                    params = sample_params(model_kind, trial_number, seed)
+                    running.add(executor.submit(run_trial, trial_number, model_kind, params, len(folds),
+                                                prune_thresholds(trials, len(folds)), threads))
+                if not running:
+                    break
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record = future.result()
+                    trials.append(record)
+                    log.write(json.dumps(record) + '\n')
+                    log.flush()
+                    best = max((t for t in trials if t['state'] == 'complete'), key=lambda t: t['mean_auc'], default=None)
+                    print(f"   #{record['trial']:>4} {record['state']:<8} AUC {record['mean_auc']:.4f} "
+                          f"({record['seconds']:.1f}s)  best {best['mean_auc'] if best else float('nan'):.4f}")
+    finally:
+        shared.close()
+
+    elapsed = time.perf_counter() - start
+    n_pruned = sum(t['state'] == 'pruned' for t in trials)
+    print(f"✅ {len(pending)} trials in {elapsed:.1f}s ({n_jobs} workers × {threads} threads), {n_pruned} pruned in total")
+    return trials
+
+
+def best_trial(trials):
+    """Completed trial with the highest mean validation AUC."""
+    completed = [t for t in trials if t['state'] == 'complete']
+    return max(completed, key=lambda t: t['mean_auc']) if completed else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temporal-CV hyperparameter search for the Oscar model.")
+    parser.add_argument('--study', default=None, help='Study name (default: <model>_search)')
+    parser.add_argument('--model', choices=list(SEARCH_SPACES), default='catboost')
+    parser.add_argument('--trials', type=int, default=100, help='Total trials in the study')
+    parser.add_argument('--n-jobs', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    study = args.study or f"{args.model}_search"
+    try:
+        trials = run_study(study, args.model, args.trials, args.n_jobs, args.seed)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    best = best_trial(trials)
+    if best is None:
+        print("❌ No completed trial")
+        return
+    iterations = int(np.median(best['best_iterations']))
+    print(f"\n🏆 Best trial #{best['trial']}: mean AUC {best['mean_auc']:.4f} "
+          f"(folds {', '.join(f'{a:.4f}' for a in best['fold_auc'])})")
+    print(f"   Params: {json.dumps(best['params'])}")
+    print(f"   Median best iteration: {iterations}")
+    print(f"   Log: {TUNING_DIR / f'{study}.jsonl'}")
+
+
+if __name__ == "__main__":
+    main()
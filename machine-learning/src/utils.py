@@ -1,11 +1,10 @@
 """
 Utility functions for the Oscar prediction project.
-"""
 
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+pandas is imported inside analyze_missing_values and the plotting stack
+(matplotlib/seaborn) inside the plotting functions, so importing this module
+stays cheap.
+"""
 
 
 def print_dataset_info(df, name="Dataset"):
@@ -31,22 +30,30 @@ def analyze_missing_values(df):
     Analyze and visualize missing values in DataFrame.
     
     Args:
-        df: pandas DataFrame
+        df: pandas DataFrame, an iterable of DataFrame chunks (e.g. from
+            stream_custom_query) or a src.profiling.DatasetProfile
         
     Returns:
         pandas.DataFrame: Summary of missing values
     """
-    missing = df.isnull().sum()
-    missing_pct = 100 * missing / len(df)
-    
-    missing_summary = pd.DataFrame({
-        'Column': missing.index,
-        'Missing_Count': missing.values,
-        'Missing_Percentage': missing_pct.values
-    })
-    
-    missing_summary = missing_summary[missing_summary['Missing_Count'] > 0]
-    missing_summary = missing_summary.sort_values('Missing_Percentage', ascending=False)
+    import pandas as pd
+
+    if not isinstance(df, pd.DataFrame):
+        from src.profiling import DatasetProfile, profile_chunks
+        profile = df if isinstance(df, DatasetProfile) else profile_chunks(df)
+        missing_summary = profile.missing_summary()
+    else:
+        missing = df.isnull().sum()
+        missing_pct = 100 * missing / len(df)
+        
+        missing_summary = pd.DataFrame({
+            'Column': missing.index,
+            'Missing_Count': missing.values,
+            'Missing_Percentage': missing_pct.values
+        })
+        
+        missing_summary = missing_summary[missing_summary['Missing_Count'] > 0]
+        missing_summary = missing_summary.sort_values('Missing_Percentage', ascending=False)
     
     if len(missing_summary) > 0:
         print(f"\n⚠️  Columns with missing values:")
@@ -66,6 +73,7 @@ def plot_class_balance(df, target_col='label', title='Class Balance'):
         target_col: Name of the target column
         title: Title for the plot
     """
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(1, 2, figsize=(12, 4))
     
     # Count plot
@@ -101,6 +109,7 @@ def save_figure(filename, directory='reports/figures', dpi=300):
         directory: Directory to save the figure
         dpi: Resolution
     """
+    import matplotlib.pyplot as plt
     import os
     os.makedirs(directory, exist_ok=True)
     filepath = os.path.join(directory, filename)
@@ -110,6 +119,8 @@ def save_figure(filename, directory='reports/figures', dpi=300):
 
 def set_plot_style():
     """Set consistent styling for all plots."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     sns.set_style("whitegrid")
     plt.rcParams['figure.figsize'] = (10, 6)
     plt.rcParams['font.size'] = 10